@@ -0,0 +1,76 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "repositories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_repositories_id", "repositories", ["id"])
+    op.create_index("ix_repositories_name", "repositories", ["name"])
+
+    op.create_table(
+        "files",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("repository_id", sa.Integer(), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=True),
+        sa.Column("loc", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["repository_id"], ["repositories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_files_id", "files", ["id"])
+
+    op.create_table(
+        "functions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("loc", sa.Integer(), nullable=True),
+        sa.Column("cyclomatic_complexity", sa.Integer(), nullable=True),
+        sa.Column("nesting_depth", sa.Integer(), nullable=True),
+        sa.Column("num_arguments", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["file_id"], ["files.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_functions_id", "functions", ["id"])
+
+    op.create_table(
+        "issues",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("line_number", sa.Integer(), nullable=True),
+        sa.Column("code", sa.String(), nullable=True),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["file_id"], ["files.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_issues_id", "issues", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_issues_id", table_name="issues")
+    op.drop_table("issues")
+    op.drop_index("ix_functions_id", table_name="functions")
+    op.drop_table("functions")
+    op.drop_index("ix_files_id", table_name="files")
+    op.drop_table("files")
+    op.drop_index("ix_repositories_name", table_name="repositories")
+    op.drop_index("ix_repositories_id", table_name="repositories")
+    op.drop_table("repositories")
@@ -0,0 +1,93 @@
+"""Analysis jobs, symbols, query indexes and repository summaries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.add_column(sa.Column("end_line_number", sa.Integer(), nullable=True))
+
+    op.create_index(
+        "ix_files_repository_id_file_path", "files", ["repository_id", "file_path"]
+    )
+    op.create_index(
+        "ix_functions_file_id_complexity",
+        "functions",
+        ["file_id", "cyclomatic_complexity"],
+    )
+    op.create_index("ix_issues_file_id_message", "issues", ["file_id", "message"])
+    op.create_index("ix_issues_message", "issues", ["message"])
+
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("repository_name", sa.String(), nullable=True),
+        sa.Column("upload_path", sa.String(), nullable=True),
+        sa.Column("state", sa.String(), nullable=True),
+        sa.Column("files_total", sa.Integer(), nullable=True),
+        sa.Column("files_done", sa.Integer(), nullable=True),
+        sa.Column("repository_id", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["repository_id"], ["repositories.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_analysis_jobs_id", "analysis_jobs", ["id"])
+    op.create_index("ix_analysis_jobs_state", "analysis_jobs", ["state"])
+
+    op.create_table(
+        "symbols",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("file_id", sa.Integer(), nullable=True),
+        sa.Column("kind", sa.String(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("line_number", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["file_id"], ["files.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_symbols_id", "symbols", ["id"])
+    op.create_index("ix_symbols_file_id", "symbols", ["file_id"])
+
+    op.create_table(
+        "repository_summaries",
+        sa.Column("repository_id", sa.Integer(), nullable=False),
+        sa.Column("total_files", sa.Integer(), nullable=True),
+        sa.Column("total_loc", sa.Integer(), nullable=True),
+        sa.Column("total_functions", sa.Integer(), nullable=True),
+        sa.Column("total_issues", sa.Integer(), nullable=True),
+        sa.Column("mean_complexity", sa.Float(), nullable=True),
+        sa.Column("max_complexity", sa.Integer(), nullable=True),
+        sa.Column("issue_counts", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["repository_id"], ["repositories.id"]),
+        sa.PrimaryKeyConstraint("repository_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("repository_summaries")
+    op.drop_index("ix_symbols_file_id", table_name="symbols")
+    op.drop_index("ix_symbols_id", table_name="symbols")
+    op.drop_table("symbols")
+    op.drop_index("ix_analysis_jobs_state", table_name="analysis_jobs")
+    op.drop_index("ix_analysis_jobs_id", table_name="analysis_jobs")
+    op.drop_table("analysis_jobs")
+    op.drop_index("ix_issues_message", table_name="issues")
+    op.drop_index("ix_issues_file_id_message", table_name="issues")
+    op.drop_index("ix_functions_file_id_complexity", table_name="functions")
+    op.drop_index("ix_files_repository_id_file_path", table_name="files")
+    with op.batch_alter_table("issues") as batch_op:
+        batch_op.drop_column("end_line_number")
@@ -0,0 +1,76 @@
+"""Projects linking repository snapshots over time, and file content hashes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "projects",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_projects_id", "projects", ["id"])
+
+    with op.batch_alter_table("repositories") as batch_op:
+        batch_op.add_column(sa.Column("project_id", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("sequence", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("created_at", sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_repositories_project_id", "projects", ["project_id"], ["id"]
+        )
+
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(64), nullable=True))
+
+    # Existing repositories become the snapshots of the project of their name,
+    # numbered in creation order
+    op.execute(
+        "INSERT INTO projects (name) "
+        "SELECT DISTINCT name FROM repositories WHERE name IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE repositories SET project_id = "
+        "(SELECT projects.id FROM projects WHERE projects.name = repositories.name)"
+    )
+    op.execute(
+        "UPDATE repositories SET sequence = "
+        "(SELECT COUNT(*) FROM repositories AS earlier "
+        "WHERE earlier.project_id = repositories.project_id "
+        "AND earlier.id <= repositories.id) "
+        "WHERE project_id IS NOT NULL"
+    )
+
+    op.create_index(
+        "ix_repositories_project_id_sequence",
+        "repositories",
+        ["project_id", "sequence"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_repositories_project_id_sequence", table_name="repositories")
+    with op.batch_alter_table("files") as batch_op:
+        batch_op.drop_column("content_hash")
+    with op.batch_alter_table("repositories") as batch_op:
+        batch_op.drop_constraint("fk_repositories_project_id", type_="foreignkey")
+        batch_op.drop_column("created_at")
+        batch_op.drop_column("sequence")
+        batch_op.drop_column("project_id")
+    op.drop_index("ix_projects_id", table_name="projects")
+    op.drop_table("projects")
@@ -0,0 +1,201 @@
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.analysis import python_analyzer, sql_analyzer, sql_rules
+from src.analysis.records import FileRecord
+from src.core.config import settings
+
+# Bumped whenever the serialized form of cached results changes
+CACHE_FORMAT_VERSION = "2"
+
+
+def analyzer_fingerprint(file_path: str) -> str:
+    """
+    Identifies the analyzer and rule configuration that applies to a file, so
+    cached results are invalidated when either changes.
+    """
+    if file_path.endswith(".py"):
+        return json.dumps(
+            [
+                "py",
+                python_analyzer.ANALYZER_VERSION,
+                python_analyzer.MAX_COMPLEXITY,
+                python_analyzer.MAX_FUNCTION_LOC,
+                python_analyzer.MAX_NESTING_DEPTH,
+                python_analyzer.MAX_ARGUMENTS,
+            ]
+        )
+    if file_path.endswith(".sql"):
+        return json.dumps(
+            ["sql", sql_analyzer.ANALYZER_VERSION]
+            + [rule.message for rule in sql_rules.RULES]
+        )
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def content_key(file_path: str, content: bytes) -> str:
+    """
+    Builds the cache key for a file from its content and analyzer fingerprint.
+    """
+    digest = hashlib.sha256(CACHE_FORMAT_VERSION.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(analyzer_fingerprint(file_path).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def file_key(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return content_key(file_path, f.read())
+
+
+class AnalysisCache:
+    """
+    Persistent, size-bounded cache of serialized FileRecord results keyed by
+    content hash. The least recently used entries are evicted once the cache
+    holds more than max_entries results.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS analysis_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_cache_last_used "
+            "ON analysis_cache (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, FileRecord]:
+        """
+        Returns the cached analyses for the given keys, marking them as used.
+        The stored file_path is that of the first file seen with the content.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, FileRecord] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start : start + 500]
+                rows = self._conn.execute(
+                    "SELECT key, value FROM analysis_cache WHERE key IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = FileRecord.from_row(json.loads(value))
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE analysis_cache SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[FileRecord]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, FileRecord]]) -> None:
+        now = time.time()
+        rows = [
+            (key, json.dumps(analysis.to_row(), separators=(",", ":")), now)
+            for key, analysis in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, last_used) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def put(self, key: str, analysis: FileRecord) -> None:
+        self.put_many([(key, analysis)])
+
+    def _evict(self) -> None:
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()
+        excess = size - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                "SELECT key FROM analysis_cache ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            (size,) = self._conn.execute(
+                "SELECT COUNT(*) FROM analysis_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache(
+            settings.ANALYSIS_CACHE_PATH, settings.ANALYSIS_CACHE_MAX_ENTRIES
+        )
+    return _cache
+
+
+def with_file_path(analysis: FileRecord, file_path: str) -> FileRecord:
+    if analysis.file_path == file_path:
+        return analysis
+    return dataclasses.replace(analysis, file_path=file_path)
+
+
+def split_cached(
+    sources: List[Tuple[str, Optional[bytes]]],
+) -> Tuple[Dict[int, FileRecord], List[int], List[str]]:
+    """
+    Hashes the sources and looks them up in the cache. A source without
+    content is read from its path. Returns the cached analyses by position,
+    the positions that still need analysis, and the cache key of every source.
+    """
+    keys = [
+        content_key(file_path, content) if content is not None else file_key(file_path)
+        for file_path, content in sources
+    ]
+    cached = get_analysis_cache().get_many(keys)
+    hits: Dict[int, FileRecord] = {}
+    misses: List[int] = []
+    for index, key in enumerate(keys):
+        if key in cached:
+            hits[index] = with_file_path(cached[key], sources[index][0])
+        else:
+            misses.append(index)
+    return hits, misses, keys
@@ -0,0 +1,289 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from src.analysis.cache import get_analysis_cache, split_cached
+from src.analysis.parse_cache import disable_parse_cache
+from src.analysis.records import FileRecord
+from src.analysis.python_analyzer import PythonCodeAnalyzer
+from src.analysis.sql_analyzer import SQLAnalyzer
+from src.core.config import settings
+from src.core.instrumentation import REGISTRY, StageTimings
+
+SUPPORTED_EXTENSIONS = (".py", ".sql")
+
+# A file to analyze: its path and, for in-memory sources, its content
+SourceFile = Tuple[str, Optional[bytes]]
+
+# A file left out of the results because it could not be parsed: its path and
+# the error
+SkippedFile = Tuple[str, str]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_worker_count() -> int:
+    """
+    Returns the configured number of analysis workers, defaulting to the CPU count.
+    """
+    return settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=get_worker_count(), initializer=disable_parse_cache
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def collect_source_files(root_dir: str) -> List[str]:
+    """
+    Returns the analyzable files below root_dir in a deterministic order.
+    """
+    file_paths = []
+    for root, _, files in os.walk(root_dir):
+        for file in files:
+            if file.endswith(SUPPORTED_EXTENSIONS):
+                file_paths.append(os.path.join(root, file))
+    return sorted(file_paths)
+
+
+def analyze_file(
+    file_path: str,
+    source: Optional[Union[str, bytes]] = None,
+    timings: Optional[StageTimings] = None,
+) -> FileRecord:
+    """
+    Runs the analyzer matching the file extension. When source is given the
+    file is analyzed from memory instead of being read from file_path. When
+    timings is given, the time spent parsing, computing metrics and running
+    each SQL rule is added to it.
+    """
+    if file_path.endswith(".py"):
+        if timings is None:
+            return PythonCodeAnalyzer(file_path, source).analyze()
+        with timings.time("parse"):
+            analyzer = PythonCodeAnalyzer(file_path, source)
+        with timings.time("metrics"):
+            return analyzer.analyze()
+    if file_path.endswith(".sql"):
+        if timings is None:
+            return SQLAnalyzer(file_path, source).analyze()
+        with timings.time("sql"):
+            return SQLAnalyzer(file_path, source, timings).analyze()
+    raise ValueError(f"Unsupported file type: {file_path}")
+
+
+def analyze_batch(
+    sources: Sequence[SourceFile], skip_invalid: bool = False
+) -> Tuple[List[Optional[FileRecord]], StageTimings, List[SkippedFile]]:
+    """
+    Analyzes a chunk of files inside a single worker task, returning the
+    results with the time spent in each stage. With skip_invalid, a file that
+    cannot be parsed does not fail the chunk: its result is None and it is
+    listed with the error.
+    """
+    timings = StageTimings()
+    analyses: List[Optional[FileRecord]] = []
+    skipped: List[SkippedFile] = []
+    for file_path, content in sources:
+        try:
+            analyses.append(analyze_file(file_path, content, timings))
+        except (SyntaxError, ValueError) as e:
+            if not skip_invalid:
+                raise
+            analyses.append(None)
+            skipped.append((file_path, str(e)))
+    return analyses, timings, skipped
+
+
+def chunk_files(
+    sources: Sequence[SourceFile], chunk_size: int
+) -> List[List[SourceFile]]:
+    return [
+        list(sources[i : i + chunk_size]) for i in range(0, len(sources), chunk_size)
+    ]
+
+
+def _merge_results(
+    cached: Dict[int, FileRecord],
+    misses: List[int],
+    analyses: List[Optional[FileRecord]],
+    keys: List[str],
+    timings: StageTimings,
+) -> List[FileRecord]:
+    """
+    Stores fresh analyses in the cache and returns all results in input order,
+    with their content hash set. Skipped files (None) are left out.
+    """
+    fresh = {
+        index: analysis
+        for index, analysis in zip(misses, analyses)
+        if analysis is not None
+    }
+    if fresh:
+        with timings.time("cache_store"):
+            get_analysis_cache().put_many(
+                (keys[index], analysis) for index, analysis in fresh.items()
+            )
+    REGISTRY.increment("files_total", len(keys))
+    REGISTRY.increment("cache_hits_total", len(cached))
+    REGISTRY.increment("cache_misses_total", len(misses))
+    results = []
+    for index, key in enumerate(keys):
+        analysis = cached[index] if index in cached else fresh.get(index)
+        if analysis is None:
+            continue
+        # The cache key doubles as the content hash stored with each file:
+        # equal keys mean equal content analyzed with the same rules
+        analysis.content_hash = key
+        results.append(analysis)
+    return results
+
+
+def _split_cached(
+    sources: List[SourceFile], timings: StageTimings
+) -> Tuple[Dict[int, FileRecord], List[int], List[str]]:
+    with timings.time("cache_lookup"):
+        return split_cached(sources)
+
+
+def _record_skipped(
+    batch_skipped: List[SkippedFile], skipped: Optional[List[SkippedFile]]
+) -> None:
+    if batch_skipped and skipped is not None:
+        skipped.extend(batch_skipped)
+        REGISTRY.increment("files_skipped_total", len(batch_skipped))
+
+
+def _analyze_uncached(
+    sources: Sequence[SourceFile],
+    timings: StageTimings,
+    parallel: bool = True,
+    skipped: Optional[List[SkippedFile]] = None,
+) -> List[Optional[FileRecord]]:
+    if not sources:
+        return []
+    skip_invalid = skipped is not None
+    chunks = chunk_files(sources, settings.ANALYSIS_CHUNK_SIZE)
+    if not parallel or len(chunks) == 1 or get_worker_count() == 1:
+        batches = [analyze_batch(sources, skip_invalid)]
+    else:
+        batches = get_executor().map(analyze_batch, chunks, repeat(skip_invalid))
+
+    results: List[Optional[FileRecord]] = []
+    for batch, batch_timings, batch_skipped in batches:
+        results.extend(batch)
+        timings.merge(batch_timings)
+        _record_skipped(batch_skipped, skipped)
+    return results
+
+
+def analyze_sources(
+    sources: Sequence[SourceFile],
+    timings: Optional[StageTimings] = None,
+    parallel: bool = True,
+    skipped: Optional[List[SkippedFile]] = None,
+) -> List[FileRecord]:
+    """
+    Analyzes files in the process pool, returning results in input order.
+    Files whose content was analyzed before are served from the cache.
+
+    Stage timings are added to timings when given, the caller then being
+    responsible for recording them; otherwise they are recorded in the
+    process-wide metrics directly. With parallel=False all files are analyzed
+    in the calling thread, e.g. so that a profiler sees the work. When
+    skipped is given, files that cannot be parsed are left out of the results
+    and appended to it instead of failing the whole analysis.
+    """
+    if not sources:
+        return []
+    owned = timings is None
+    timings = timings if timings is not None else StageTimings()
+    cached, misses, keys = _split_cached(list(sources), timings)
+    analyses = _analyze_uncached(
+        [sources[index] for index in misses], timings, parallel, skipped
+    )
+    results = _merge_results(cached, misses, analyses, keys, timings)
+    if owned:
+        REGISTRY.record(timings)
+    return results
+
+
+def analyze_files(file_paths: Sequence[str]) -> List[FileRecord]:
+    return analyze_sources([(file_path, None) for file_path in file_paths])
+
+
+async def analyze_sources_async(
+    sources: Sequence[SourceFile],
+    progress: Optional[Callable[[int], None]] = None,
+    timings: Optional[StageTimings] = None,
+    skipped: Optional[List[SkippedFile]] = None,
+) -> List[FileRecord]:
+    """
+    Analyzes files in the process pool without blocking the event loop.
+    Results are returned in input order, with unchanged files served from the
+    cache. progress, if given, is called on the event loop with the number of
+    files completed so far. Stage timings and skipped files are handled as in
+    analyze_sources.
+    """
+    if not sources:
+        return []
+    owned = timings is None
+    timings = timings if timings is not None else StageTimings()
+    loop = asyncio.get_running_loop()
+    cached, misses, keys = await loop.run_in_executor(
+        None, _split_cached, list(sources), timings
+    )
+
+    completed = len(cached)
+    if progress:
+        progress(completed)
+
+    def on_chunk_done(size: int) -> None:
+        nonlocal completed
+        completed += size
+        progress(completed)
+
+    executor = get_executor()
+    futures = []
+    for chunk in chunk_files(
+        [sources[index] for index in misses], settings.ANALYSIS_CHUNK_SIZE
+    ):
+        future = loop.run_in_executor(
+            executor, analyze_batch, chunk, skipped is not None
+        )
+        if progress:
+            future.add_done_callback(lambda _, size=len(chunk): on_chunk_done(size))
+        futures.append(future)
+
+    batches = await asyncio.gather(*futures)
+    analyses: List[Optional[FileRecord]] = []
+    for batch, batch_timings, batch_skipped in batches:
+        analyses.extend(batch)
+        timings.merge(batch_timings)
+        _record_skipped(batch_skipped, skipped)
+    results = await loop.run_in_executor(
+        None, _merge_results, cached, misses, analyses, keys, timings
+    )
+    if owned:
+        REGISTRY.record(timings)
+    return results
+
+
+async def analyze_files_async(file_paths: Sequence[str]) -> List[FileRecord]:
+    return await analyze_sources_async([(file_path, None) for file_path in file_paths])
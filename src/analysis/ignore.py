@@ -0,0 +1,177 @@
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.analysis.engine import SUPPORTED_EXTENSIONS
+
+# Directories never worth analyzing: version control metadata, virtual
+# environments, dependency and build output, and tool caches
+DEFAULT_IGNORED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".venv",
+        "venv",
+        "env",
+        ".env",
+        "__pycache__",
+        "node_modules",
+        "site-packages",
+        "build",
+        "dist",
+        ".eggs",
+        ".tox",
+        ".nox",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+    }
+)
+
+
+class IgnoreRule:
+    """
+    A single .gitignore pattern, matched against paths relative to the
+    directory of the .gitignore file that declared it.
+    """
+
+    __slots__ = ("negated", "dir_only", "anchored", "regex")
+
+    def __init__(self, pattern: str):
+        self.negated = pattern.startswith("!")
+        if self.negated:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # Patterns containing a slash are relative to the .gitignore location;
+        # the others match a file or directory name at any depth
+        self.anchored = "/" in pattern
+        self.regex = re.compile(_translate(pattern.lstrip("/")))
+
+    def matches(self, relative_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        target = relative_path if self.anchored else relative_path.rsplit("/", 1)[-1]
+        return self.regex.fullmatch(target) is not None
+
+
+def _translate(pattern: str) -> str:
+    """
+    Translates a gitignore glob to a regular expression.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+            parts.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            i = end + 1
+        elif pattern[i] == "\\" and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(parts)
+
+
+def parse_ignore_patterns(lines: Iterable[str]) -> List[IgnoreRule]:
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if line and not line.startswith("#"):
+            rules.append(IgnoreRule(line))
+    return rules
+
+
+def _read_gitignore(directory: str) -> List[IgnoreRule]:
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8") as f:
+            return parse_ignore_patterns(f)
+    except (OSError, UnicodeDecodeError):
+        return []
+
+
+def _is_ignored(
+    rule_sets: Sequence[Tuple[str, List[IgnoreRule]]], path: str, is_dir: bool
+) -> bool:
+    """
+    Applies the rules of every enclosing .gitignore, outermost first, the last
+    matching rule deciding as in git.
+    """
+    ignored = False
+    for base, rules in rule_sets:
+        relative_path = path[len(base) + 1 :] if base else path
+        for rule in rules:
+            if rule.matches(relative_path, is_dir):
+                ignored = not rule.negated
+    return ignored
+
+
+def _is_virtualenv(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, "pyvenv.cfg"))
+
+
+def walk_source_files(
+    root_dir: str, extra_patterns: Optional[Iterable[str]] = None
+) -> Iterator[str]:
+    """
+    Yields the analyzable files below root_dir as paths relative to it, in a
+    deterministic order. Ignored directories are pruned during the walk, so
+    their contents are never listed: the default ignored directories, virtual
+    environments, and whatever the .gitignore files of the tree or
+    extra_patterns (gitignore syntax, relative to root_dir) exclude.
+    """
+    root_rules = parse_ignore_patterns(extra_patterns or [])
+    # (directory relative to root_dir, rules of its .gitignore)
+    stack: List[Tuple[str, List[IgnoreRule]]] = []
+
+    def walk(relative_dir: str) -> Iterator[str]:
+        directory = os.path.join(root_dir, relative_dir) if relative_dir else root_dir
+        rules = _read_gitignore(directory)
+        if not relative_dir:
+            rules = rules + root_rules
+        if rules:
+            stack.append((relative_dir, rules))
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if (
+                    entry.name in DEFAULT_IGNORED_DIRS
+                    or entry.name.endswith(".egg-info")
+                    or _is_virtualenv(entry.path)
+                    or _is_ignored(stack, path, True)
+                ):
+                    continue
+                yield from walk(path)
+            elif entry.name.endswith(SUPPORTED_EXTENSIONS) and entry.is_file():
+                if not _is_ignored(stack, path, False):
+                    yield path
+        if rules:
+            stack.pop()
+
+    yield from walk("")
@@ -0,0 +1,62 @@
+import zipfile
+from typing import BinaryIO, List, Tuple
+
+from src.analysis.engine import SUPPORTED_EXTENSIONS
+
+# Bytes read from a member per call while enforcing the size limits
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """
+    Raised when an upload exceeds the per-member or total size limits.
+    """
+
+
+def read_zip_sources(
+    fileobj: BinaryIO, max_member_bytes: int, max_total_bytes: int
+) -> List[Tuple[str, bytes]]:
+    """
+    Reads the analyzable members of a ZIP archive into memory, sorted by name.
+    Limits are enforced on the bytes actually decompressed, not on the sizes
+    declared in the archive, so zip bombs are stopped early.
+    """
+    sources: List[Tuple[str, bytes]] = []
+    total = 0
+    with zipfile.ZipFile(fileobj, "r") as zip_ref:
+        members = sorted(
+            (
+                info
+                for info in zip_ref.infolist()
+                if not info.is_dir() and info.filename.endswith(SUPPORTED_EXTENSIONS)
+            ),
+            key=lambda info: info.filename,
+        )
+        for info in members:
+            if info.file_size > max_member_bytes:
+                raise UploadTooLargeError(
+                    f"{info.filename} exceeds the {max_member_bytes} byte member limit"
+                )
+            if total + info.file_size > max_total_bytes:
+                raise UploadTooLargeError(
+                    f"Upload exceeds the {max_total_bytes} byte total limit"
+                )
+
+            chunks = []
+            size = 0
+            with zip_ref.open(info) as member:
+                while chunk := member.read(READ_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_member_bytes:
+                        raise UploadTooLargeError(
+                            f"{info.filename} exceeds the {max_member_bytes} "
+                            "byte member limit"
+                        )
+                    if total + size > max_total_bytes:
+                        raise UploadTooLargeError(
+                            f"Upload exceeds the {max_total_bytes} byte total limit"
+                        )
+                    chunks.append(chunk)
+            total += size
+            sources.append((info.filename, b"".join(chunks)))
+    return sources
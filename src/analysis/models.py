@@ -6,6 +6,8 @@ class Issue(BaseModel):
     code: str
     line_number: int
     message: str
+    # Last line of the flagged code when it spans several lines
+    end_line_number: Optional[int] = None
 
 
 class FunctionMetrics(BaseModel):
@@ -17,11 +19,25 @@ class FunctionMetrics(BaseModel):
     issues: List[Issue]
 
 
+class Definition(BaseModel):
+    name: str
+    line_number: int
+
+
+class FileSymbols(BaseModel):
+    definitions: List[Definition] = []
+    # Names called directly or as attributes, e.g. f() and obj.f()
+    references: List[str] = []
+    # Names imported with "from module import name"
+    imports: List[str] = []
+
+
 class FileAnalysis(BaseModel):
     file_path: str
     loc: int
     functions: List[FunctionMetrics]
     issues: List[Issue]
+    symbols: Optional[FileSymbols] = None
 
 
 class AnalysisResult(BaseModel):
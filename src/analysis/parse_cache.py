@@ -0,0 +1,170 @@
+import ast
+import os
+import sys
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.analysis.source import load_source
+from src.core.config import settings
+
+# Approximate memory held by an AST per character of source, measured on the
+# standard library; used to charge entries against the cache's memory cap
+AST_BYTES_PER_CHAR = 30
+
+
+class ParsedSource:
+    """
+    A Python source file parsed once: its text, the offset at which each line
+    starts, and its AST. The tree is shared between users and must not be
+    modified.
+    """
+
+    __slots__ = ("file_path", "source", "line_offsets", "tree")
+
+    def __init__(self, file_path: str, source: str):
+        self.file_path = file_path
+        self.source = source
+        lines = source.splitlines(keepends=True)
+        self.line_offsets: List[int] = [0, *accumulate(len(line) for line in lines)][
+            : len(lines)
+        ]
+        self.tree = ast.parse(source, filename=file_path)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def get_lines(self, start: int, end: int) -> str:
+        """
+        Returns the text of lines start through end, numbered from 1.
+        """
+        start = max(start, 1)
+        if start > self.line_count or end < start:
+            return ""
+        begin = self.line_offsets[start - 1]
+        stop = self.line_offsets[end] if end < self.line_count else len(self.source)
+        return self.source[begin:stop]
+
+    def line_number_at(self, offset: int) -> int:
+        """
+        Returns the line number, from 1, containing the character at offset.
+        """
+        return bisect_right(self.line_offsets, offset)
+
+    @property
+    def estimated_bytes(self) -> int:
+        return (
+            sys.getsizeof(self.source)
+            + 8 * len(self.line_offsets)
+            + AST_BYTES_PER_CHAR * len(self.source)
+        )
+
+
+class ParsedSourceCache:
+    """
+    In-process cache of parsed Python files keyed by path, invalidated when the
+    file's mtime or size changes. The least recently used entries are evicted
+    once the estimated memory of all entries exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, ParsedSource]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> ParsedSource:
+        """
+        Returns the parsed file, parsing it only when it is not cached or has
+        changed on disk since it was cached.
+        """
+        stat = os.stat(file_path)
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(file_path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        parsed = ParsedSource(file_path, load_source(file_path))
+        with self._lock:
+            self._remove(file_path)
+            size = parsed.estimated_bytes
+            if size <= self.max_bytes:
+                self._entries[file_path] = (stat.st_mtime_ns, stat.st_size, parsed)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return parsed
+
+    def _remove(self, file_path: str) -> None:
+        entry = self._entries.pop(file_path, None)
+        if entry is not None:
+            self.current_bytes -= entry[2].estimated_bytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "estimated_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[ParsedSourceCache] = None
+
+# Cleared in analysis worker processes, see disable_parse_cache
+_enabled = True
+
+
+def get_parse_cache() -> ParsedSourceCache:
+    global _cache
+    if _cache is None:
+        _cache = ParsedSourceCache(settings.PARSE_CACHE_MAX_BYTES)
+    return _cache
+
+
+def disable_parse_cache() -> None:
+    """
+    Makes this process parse every file directly. Used as the initializer of
+    the analysis worker processes: chunks are handed out to workers in no
+    particular order, so a worker's cache would rarely be hit while holding
+    up to PARSE_CACHE_MAX_BYTES, and its statistics would not be reported.
+    """
+    global _enabled
+    _enabled = False
+
+
+def parse_python(
+    file_path: str, source: Optional[Union[str, bytes]] = None
+) -> ParsedSource:
+    """
+    Returns the parsed file. Files read from disk by the main process go
+    through the shared cache; this covers the files analyzed in-process, as
+    by the evaluation benchmark and the benchmark suite. In-memory sources
+    (uploads, the CLI) and files parsed in worker processes are parsed
+    directly, their results being cached by content in the analysis cache
+    instead.
+    """
+    if source is None and _enabled:
+        return get_parse_cache().get(file_path)
+    return ParsedSource(file_path, load_source(file_path, source))
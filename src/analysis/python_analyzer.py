@@ -1,90 +1,188 @@
 import ast
-from typing import List, Dict, Any
+from typing import List, Any, Optional, Set, Union
 
-# Assuming src.analysis.models is correctly defined as per previous steps
-from src.analysis.models import FunctionMetrics, Issue, FileAnalysis
+from src.analysis.records import (
+    DefinitionRecord,
+    FileRecord,
+    FunctionRecord,
+    IssueRecord,
+    SymbolsRecord,
+)
+from src.analysis.parse_cache import parse_python
+
+# Bumped whenever a change to the analyzer alters its results
+ANALYZER_VERSION = "3"
+
+# Rule thresholds: a function is flagged when its metric exceeds the limit
+MAX_COMPLEXITY = 10
+MAX_FUNCTION_LOC = 50
+MAX_NESTING_DEPTH = 4
+MAX_ARGUMENTS = 5
+
+# Nodes that add a decision point to the cyclomatic complexity of the enclosing
+# function. A BoolOp counts once regardless of how many operands it has.
+DECISION_NODES = (ast.If, ast.For, ast.While, ast.BoolOp, ast.ExceptHandler)
+
+# Nodes that open a new nesting level.
+NESTING_NODES = (ast.If, ast.For, ast.While, ast.With, ast.AsyncWith)
+
+
+class _FunctionFrame:
+    """
+    Running metrics for a function whose body is currently being traversed.
+    """
+
+    __slots__ = ("node", "index", "base_nesting", "decisions", "max_nesting")
+
+    def __init__(self, node: ast.FunctionDef, index: int, base_nesting: int):
+        self.node = node
+        self.index = index
+        self.base_nesting = base_nesting
+        self.decisions = 0
+        self.max_nesting = 0
 
 
 class PythonCodeAnalyzer(ast.NodeVisitor):
     """
     Analyzes a single Python file to extract metrics and identify issues.
+
+    All metrics are computed in a single traversal of the tree: every node is
+    visited exactly once, and metrics of nested functions are folded into the
+    enclosing function when the nested function is closed. The same pass
+    collects the definitions, imports and call references of the file, from
+    which dead code is detected across the whole repository (see
+    src.analysis.symbols).
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, source: Optional[Union[str, bytes]] = None):
         self.file_path = file_path
-        with open(file_path, "r", encoding="utf-8") as f:
-            self.source_code = f.read()
-            self.lines = self.source_code.splitlines()
-        self.tree = ast.parse(self.source_code, filename=file_path)
-        self.functions: List[FunctionMetrics] = []
-        self.file_issues: List[Issue] = []
-
-    def analyze(self) -> FileAnalysis:
+        # Files on disk are parsed once and shared through the parse cache
+        self.parsed = parse_python(file_path, source)
+        self.source_code = self.parsed.source
+        self.tree = self.parsed.tree
+        self.functions: List[FunctionRecord] = []
+        self.file_issues: List[IssueRecord] = []
+        self.definitions: List[DefinitionRecord] = []
+        self.references: Set[str] = set()
+        self.imports: Set[str] = set()
+        self.nodes_visited = 0
+        self._frames: List[_FunctionFrame] = []
+        self._nesting = 0
+
+    def analyze(self) -> FileRecord:
         """
         Triggers the analysis of the file.
         """
         self.visit(self.tree)
-        # Detect dead code (unused functions)
-        self._detect_dead_code()
-        return FileAnalysis(
+        return FileRecord(
             file_path=self.file_path,
-            loc=len(self.lines),
+            loc=self.parsed.line_count,
             functions=self.functions,
             issues=self.file_issues,
+            symbols=SymbolsRecord(
+                definitions=self.definitions,
+                references=sorted(self.references),
+                imports=sorted(self.imports),
+            ),
         )
 
+    def visit(self, node: ast.AST) -> Any:
+        """
+        Visit a node, updating the metrics of the innermost open function.
+        """
+        self.nodes_visited += 1
+        frame = self._frames[-1] if self._frames else None
+
+        nests = isinstance(node, NESTING_NODES)
+        if nests:
+            self._nesting += 1
+        if frame is not None:
+            if isinstance(node, DECISION_NODES):
+                frame.decisions += 1
+            if nests:
+                frame.max_nesting = max(
+                    frame.max_nesting, self._nesting - frame.base_nesting
+                )
+        if isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                self.references.add(node.func.id)
+            elif isinstance(node.func, ast.Attribute):
+                self.references.add(node.func.attr)
+        elif isinstance(node, ast.ImportFrom):
+            self.imports.update(alias.name for alias in node.names)
+
+        super().visit(node)
+
+        if nests:
+            self._nesting -= 1
+
     def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
         """
         Visit a function definition and extract metrics.
         """
-        metrics = self._calculate_function_metrics(node)
-        self.functions.append(metrics)
+        self.definitions.append(DefinitionRecord(node.name, node.lineno))
+
+        frame = _FunctionFrame(node, len(self.functions), self._nesting)
+        # Reserve the slot so functions keep their definition order.
+        self.functions.append(None)  # type: ignore[arg-type]
+        self._frames.append(frame)
         self.generic_visit(node)
+        self._frames.pop()
+
+        self.functions[frame.index] = self._build_function_metrics(frame)
+        if self._frames:
+            parent = self._frames[-1]
+            parent.decisions += frame.decisions
+            parent.max_nesting = max(
+                parent.max_nesting,
+                frame.max_nesting + frame.base_nesting - parent.base_nesting,
+            )
 
-    def _calculate_function_metrics(self, node: ast.FunctionDef) -> FunctionMetrics:
+    def _build_function_metrics(self, frame: _FunctionFrame) -> FunctionRecord:
         """
-        Calculates metrics for a given function node.
+        Builds the metrics and issues for a fully traversed function.
         """
+        node = frame.node
         loc = node.end_lineno - node.lineno if node.end_lineno else 0
-        complexity = self._calculate_cyclomatic_complexity(node)
-        nesting_depth = self._calculate_nesting_depth(node)
+        complexity = 1 + frame.decisions
+        nesting_depth = frame.max_nesting
         num_args = len(node.args.args)
 
         issues = []
-        if complexity > 10:
+        if complexity > MAX_COMPLEXITY:
             issues.append(
-                Issue(
+                IssueRecord(
                     code=node.name,
                     line_number=node.lineno,
                     message="High cyclomatic complexity",
                 )
             )
-        if loc > 50:
+        if loc > MAX_FUNCTION_LOC:
             issues.append(
-                Issue(
+                IssueRecord(
                     code=node.name,
                     line_number=node.lineno,
                     message="God function (too long)",
                 )
             )
-        if nesting_depth > 4:
+        if nesting_depth > MAX_NESTING_DEPTH:
             issues.append(
-                Issue(
+                IssueRecord(
                     code=node.name,
                     line_number=node.lineno,
                     message="Deeply nested function",
                 )
             )
-        if num_args > 5:
+        if num_args > MAX_ARGUMENTS:
             issues.append(
-                Issue(
+                IssueRecord(
                     code=node.name,
                     line_number=node.lineno,
                     message="Long parameter list",
                 )
             )
 
-        return FunctionMetrics(
+        return FunctionRecord(
             name=node.name,
             loc=loc,
             cyclomatic_complexity=complexity,
@@ -92,61 +190,3 @@ class PythonCodeAnalyzer(ast.NodeVisitor):
             num_arguments=num_args,
             issues=issues,
         )
-
-    def _calculate_cyclomatic_complexity(self, node: ast.FunctionDef) -> int:
-        """
-        Calculates cyclomatic complexity of a function.
-        """
-        complexity = 1
-        for sub_node in ast.walk(node):
-            if isinstance(
-                sub_node,
-                (ast.If, ast.For, ast.While, ast.And, ast.Or, ast.ExceptHandler),
-            ):
-                complexity += 1
-        return complexity
-
-    def _calculate_nesting_depth(self, node: ast.AST, current_depth: int = 0) -> int:
-        """
-        Calculates the maximum nesting depth of a node.
-        """
-        max_depth = current_depth
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, (ast.If, ast.For, ast.While, ast.With, ast.AsyncWith)):
-                max_depth = max(
-                    max_depth, self._calculate_nesting_depth(child, current_depth + 1)
-                )
-            else:
-                max_depth = max(
-                    max_depth, self._calculate_nesting_depth(child, current_depth)
-                )
-        return max_depth
-
-    def _detect_dead_code(self) -> None:
-        """
-        Detects unused functions within the file.
-        """
-        defined_functions = {f.name for f in self.functions}
-        called_functions = set()
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                called_functions.add(node.func.id)
-
-        dead_functions = defined_functions - called_functions
-        for func_metrics in self.functions:
-            if func_metrics.name in dead_functions:
-                self.file_issues.append(
-                    Issue(
-                        code=func_metrics.name,
-                        line_number=next(
-                            (
-                                n.lineno
-                                for n in ast.walk(self.tree)
-                                if isinstance(n, ast.FunctionDef)
-                                and n.name == func_metrics.name
-                            ),
-                            0,
-                        ),
-                        message="Dead code (unused function)",
-                    )
-                )
@@ -0,0 +1,240 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+from src.analysis import models
+
+
+@dataclass(slots=True)
+class IssueRecord:
+    code: str
+    line_number: int
+    message: str
+    end_line_number: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        # Messages come from a handful of rules; share one string per message
+        self.message = sys.intern(self.message)
+
+    def __reduce__(self):
+        # Positional arguments pickle smaller and faster than slot state
+        return (
+            IssueRecord,
+            (self.code, self.line_number, self.message, self.end_line_number),
+        )
+
+    def to_model(self) -> models.Issue:
+        return models.Issue.model_construct(
+            code=self.code,
+            line_number=self.line_number,
+            message=self.message,
+            end_line_number=self.end_line_number,
+        )
+
+    @classmethod
+    def from_model(cls, issue: models.Issue) -> "IssueRecord":
+        return cls(issue.code, issue.line_number, issue.message, issue.end_line_number)
+
+    def to_row(self) -> List[Any]:
+        return [self.code, self.line_number, self.message, self.end_line_number]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "IssueRecord":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class FunctionRecord:
+    name: str
+    loc: int
+    cyclomatic_complexity: int
+    nesting_depth: int
+    num_arguments: int
+    issues: List[IssueRecord] = field(default_factory=list)
+
+    def __reduce__(self):
+        return (
+            FunctionRecord,
+            (
+                self.name,
+                self.loc,
+                self.cyclomatic_complexity,
+                self.nesting_depth,
+                self.num_arguments,
+                self.issues,
+            ),
+        )
+
+    def to_model(self) -> models.FunctionMetrics:
+        return models.FunctionMetrics.model_construct(
+            name=self.name,
+            loc=self.loc,
+            cyclomatic_complexity=self.cyclomatic_complexity,
+            nesting_depth=self.nesting_depth,
+            num_arguments=self.num_arguments,
+            issues=[issue.to_model() for issue in self.issues],
+        )
+
+    @classmethod
+    def from_model(cls, function: models.FunctionMetrics) -> "FunctionRecord":
+        return cls(
+            function.name,
+            function.loc,
+            function.cyclomatic_complexity,
+            function.nesting_depth,
+            function.num_arguments,
+            [IssueRecord.from_model(issue) for issue in function.issues],
+        )
+
+    def to_row(self) -> List[Any]:
+        return [
+            self.name,
+            self.loc,
+            self.cyclomatic_complexity,
+            self.nesting_depth,
+            self.num_arguments,
+            [issue.to_row() for issue in self.issues],
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "FunctionRecord":
+        *metrics, issues = row
+        return cls(*metrics, [IssueRecord.from_row(issue) for issue in issues])
+
+
+@dataclass(slots=True)
+class DefinitionRecord:
+    name: str
+    line_number: int
+
+    def __reduce__(self):
+        return (DefinitionRecord, (self.name, self.line_number))
+
+
+@dataclass(slots=True)
+class SymbolsRecord:
+    definitions: List[DefinitionRecord] = field(default_factory=list)
+    # Names called directly or as attributes, e.g. f() and obj.f()
+    references: List[str] = field(default_factory=list)
+    # Names imported with "from module import name"
+    imports: List[str] = field(default_factory=list)
+
+    def __reduce__(self):
+        return (SymbolsRecord, (self.definitions, self.references, self.imports))
+
+    def to_model(self) -> models.FileSymbols:
+        return models.FileSymbols.model_construct(
+            definitions=[
+                models.Definition.model_construct(
+                    name=definition.name, line_number=definition.line_number
+                )
+                for definition in self.definitions
+            ],
+            references=list(self.references),
+            imports=list(self.imports),
+        )
+
+    def to_row(self) -> List[Any]:
+        return [
+            [
+                [definition.name, definition.line_number]
+                for definition in self.definitions
+            ],
+            self.references,
+            self.imports,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "SymbolsRecord":
+        definitions, references, imports = row
+        return cls(
+            [DefinitionRecord(name, line_number) for name, line_number in definitions],
+            references,
+            imports,
+        )
+
+
+@dataclass(slots=True)
+class FileRecord:
+    """
+    Internal result of analyzing one file. Analyzers, the engine, the analysis
+    cache and persistence work with these slotted records, which are cheap to
+    create, to pickle between worker processes and to hold for large
+    repositories. They are converted to the pydantic models of
+    src.analysis.models with to_model() only where results leave the
+    application.
+    """
+
+    file_path: str
+    loc: int
+    functions: List[FunctionRecord] = field(default_factory=list)
+    issues: List[IssueRecord] = field(default_factory=list)
+    symbols: Optional[SymbolsRecord] = None
+    # Hash of the content and of the analyzer configuration, set by the engine
+    # and stored with the file; it is not part of the model or row forms
+    content_hash: Optional[str] = None
+
+    def __reduce__(self):
+        return (
+            FileRecord,
+            (
+                self.file_path,
+                self.loc,
+                self.functions,
+                self.issues,
+                self.symbols,
+                self.content_hash,
+            ),
+        )
+
+    def to_model(self) -> models.FileAnalysis:
+        return models.FileAnalysis.model_construct(
+            file_path=self.file_path,
+            loc=self.loc,
+            functions=[function.to_model() for function in self.functions],
+            issues=[issue.to_model() for issue in self.issues],
+            symbols=self.symbols.to_model() if self.symbols is not None else None,
+        )
+
+    @classmethod
+    def from_model(cls, analysis: models.FileAnalysis) -> "FileRecord":
+        symbols = None
+        if analysis.symbols is not None:
+            symbols = SymbolsRecord(
+                [
+                    DefinitionRecord(definition.name, definition.line_number)
+                    for definition in analysis.symbols.definitions
+                ],
+                list(analysis.symbols.references),
+                list(analysis.symbols.imports),
+            )
+        return cls(
+            analysis.file_path,
+            analysis.loc,
+            [FunctionRecord.from_model(function) for function in analysis.functions],
+            [IssueRecord.from_model(issue) for issue in analysis.issues],
+            symbols,
+        )
+
+    def to_row(self) -> List[Any]:
+        """
+        Returns the record as nested lists, e.g. for compact JSON encoding.
+        """
+        return [
+            self.file_path,
+            self.loc,
+            [function.to_row() for function in self.functions],
+            [issue.to_row() for issue in self.issues],
+            self.symbols.to_row() if self.symbols is not None else None,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "FileRecord":
+        file_path, loc, functions, issues, symbols = row
+        return cls(
+            file_path,
+            loc,
+            [FunctionRecord.from_row(function) for function in functions],
+            [IssueRecord.from_row(issue) for issue in issues],
+            SymbolsRecord.from_row(symbols) if symbols is not None else None,
+        )
@@ -0,0 +1,32 @@
+import io
+from typing import Iterator, Optional, Union
+
+
+def load_source(file_path: str, source: Optional[Union[str, bytes]] = None) -> str:
+    """
+    Returns the text to analyze: the given in-memory source, decoded if needed,
+    or the content of file_path when no source is given.
+    """
+    if source is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    if isinstance(source, bytes):
+        return source.decode("utf-8")
+    return source
+
+
+def iter_source_lines(
+    file_path: str, source: Optional[Union[str, bytes]] = None
+) -> Iterator[str]:
+    """
+    Yields the lines to analyze, with their line endings, without holding the
+    whole file in memory when reading from file_path. Line endings are
+    normalized to "\\n" in both cases.
+    """
+    if source is None:
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+    if isinstance(source, bytes):
+        source = source.decode("utf-8")
+    yield from io.StringIO(source, newline=None)
@@ -1,81 +1,107 @@
-import re
-from typing import List
-from src.analysis.models import Issue, FileAnalysis
+import time
+from typing import Iterator, List, Optional, Union
+from src.analysis import sql_rules
+from src.analysis.records import FileRecord, IssueRecord
+from src.analysis.source import iter_source_lines
+from src.analysis.sql_tokenizer import SQLStatement, iter_statements
+from src.core.instrumentation import StageTimings
+
+# Bumped whenever a change to the analyzer alters its results
+ANALYZER_VERSION = "3"
+
+# Longest excerpt of a statement stored as the code of its issues
+MAX_CODE_CHARS = 500
+
+
+def statement_excerpt(text: str) -> str:
+    """
+    Returns the first line of a statement, cut at MAX_CODE_CHARS, followed by
+    an ellipsis when the statement goes on, so that issues of huge statements
+    (e.g. multi-row INSERTs in dumps) do not carry the whole statement.
+    """
+    text = text.strip()
+    excerpt, newline, _ = text.partition("\n")
+    excerpt = excerpt.rstrip()
+    if len(excerpt) > MAX_CODE_CHARS:
+        return excerpt[:MAX_CODE_CHARS] + " ..."
+    return excerpt + " ..." if newline else excerpt
 
 
 class SQLAnalyzer:
     """
     Analyzes a single SQL file to identify common issues.
+
+    The file is streamed line by line and split into statements, so rules see
+    whole statements even when they span several lines, and memory use does
+    not grow with the size of the file.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(
+        self,
+        file_path: str,
+        source: Optional[Union[str, bytes]] = None,
+        timings: Optional[StageTimings] = None,
+    ):
         self.file_path = file_path
-        with open(file_path, "r", encoding="utf-8") as f:
-            self.content = f.read()
-            self.lines = self.content.splitlines()
+        self.source = source
+        # When given, receives the time spent evaluating each rule
+        self.timings = timings
+        self.loc = 0
 
-    def analyze(self) -> FileAnalysis:
+    def analyze(self) -> FileRecord:
         """
         Triggers the analysis of the SQL file.
         """
         issues = self._find_issues()
-        return FileAnalysis(
+        return FileRecord(
             file_path=self.file_path,
-            loc=len(self.lines),
+            loc=self.loc,
             functions=[],  # SQL files don't have functions in the same way Python does
             issues=issues,
         )
 
-    def _find_issues(self) -> List[Issue]:
-        """
-        Finds issues in the SQL content using regex-based detectors.
-        """
-        issues = []
-
-        # Rule 1: Detect SELECT *
-        for i, line in enumerate(self.lines):
-            if re.search(r"SELECT\s+\*", line, re.IGNORECASE):
-                issues.append(
-                    Issue(
-                        code=line.strip(),
-                        line_number=i + 1,
-                        message="Avoid using 'SELECT *'",
-                    )
-                )
+    def _count_lines(self) -> Iterator[str]:
+        self.loc = 0
+        for line in iter_source_lines(self.file_path, self.source):
+            self.loc += 1
+            yield line
 
-        # Rule 2: Missing WHERE clause in DELETE/UPDATE
-        for i, line in enumerate(self.lines):
-            if re.search(r"\b(UPDATE|DELETE)\b", line, re.IGNORECASE) and not re.search(
-                r"\bWHERE\b", line, re.IGNORECASE
-            ):
-                issues.append(
-                    Issue(
-                        code=line.strip(),
-                        line_number=i + 1,
-                        message="Missing WHERE clause in UPDATE/DELETE statement",
-                    )
-                )
+    def _iter_statements(self) -> Iterator[SQLStatement]:
+        return iter_statements(self._count_lines())
 
-        # Rule 3: Detect nested subqueries (simple detection)
-        for i, line in enumerate(self.lines):
-            if len(re.findall(r"\bSELECT\b", line, re.IGNORECASE)) > 1:
-                issues.append(
-                    Issue(
-                        code=line.strip(),
-                        line_number=i + 1,
-                        message="Potential nested subquery",
-                    )
-                )
+    def _find_issues(self) -> List[IssueRecord]:
+        """
+        Finds issues in the SQL content using the registered rules. Every
+        statement is scanned once for trigger keywords; rules only run on
+        statements containing theirs.
+        """
+        found: List[List[IssueRecord]] = [[] for _ in sql_rules.RULES]
+        candidate_rules = sql_rules.candidate_rules
+        timings = self.timings
 
-        # Rule 4: Detect hardcoded values in WHERE clauses
-        for i, line in enumerate(self.lines):
-            if re.search(r'WHERE\s+\w+\s*=\s*[\'"]', line, re.IGNORECASE):
-                issues.append(
-                    Issue(
-                        code=line.strip(),
-                        line_number=i + 1,
-                        message="Hardcoded value in WHERE clause",
+        for statement in self._iter_statements():
+            text = statement.masked_text
+            code = None
+            for index in candidate_rules(text):
+                rule = sql_rules.RULES[index]
+                if timings is None:
+                    matched = rule.check(text)
+                else:
+                    start = time.perf_counter()
+                    matched = rule.check(text)
+                    timings.add(rule.stage, time.perf_counter() - start)
+                if matched:
+                    # Issues of one statement share a single excerpt of it
+                    if code is None:
+                        code = statement_excerpt(statement.text)
+                    found[index].append(
+                        IssueRecord(
+                            code=code,
+                            line_number=statement.start_line,
+                            end_line_number=statement.end_line,
+                            message=rule.message,
+                        )
                     )
-                )
 
-        return issues
+        # Issues are grouped by rule, in registration order
+        return [issue for issues in found for issue in issues]
@@ -0,0 +1,105 @@
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# A rule check receives a line of SQL and reports whether the rule fires
+RuleCheck = Callable[[str], bool]
+
+
+class SQLRule:
+    """
+    A SQL detector. A rule is only evaluated on text containing at least one
+    of its trigger keywords, which lets a single keyword scan per statement
+    decide which rules can possibly fire.
+    """
+
+    __slots__ = ("message", "triggers", "check", "stage")
+
+    def __init__(self, message: str, triggers: Sequence[str], check: RuleCheck):
+        self.message = message
+        self.triggers = frozenset(trigger.upper() for trigger in triggers)
+        self.check = check
+        # Name under which the rule's evaluations are timed
+        self.stage = f"sql_rule.{check.__name__}"
+
+
+RULES: List[SQLRule] = []
+
+# Trigger keyword -> indexes of the rules it triggers, rebuilt after a rule
+# is registered
+_rules_by_trigger: Optional[Tuple[Tuple[str, Tuple[int, ...]], ...]] = None
+
+
+def register_rule(message: str, *triggers: str) -> Callable[[RuleCheck], RuleCheck]:
+    """
+    Registers the decorated check as a rule reporting message. Rules are
+    reported in registration order.
+    """
+
+    def decorator(check: RuleCheck) -> RuleCheck:
+        global _rules_by_trigger
+        RULES.append(SQLRule(message, triggers, check))
+        _rules_by_trigger = None
+        return check
+
+    return decorator
+
+
+def rules_by_trigger() -> Tuple[Tuple[str, Tuple[int, ...]], ...]:
+    """
+    Returns every trigger keyword with the indexes of the rules it triggers.
+    """
+    global _rules_by_trigger
+    if _rules_by_trigger is None:
+        by_trigger: Dict[str, List[int]] = {}
+        for index, rule in enumerate(RULES):
+            for trigger in rule.triggers:
+                by_trigger.setdefault(trigger, []).append(index)
+        _rules_by_trigger = tuple(
+            (trigger, tuple(indexes)) for trigger, indexes in by_trigger.items()
+        )
+    return _rules_by_trigger
+
+
+def candidate_rules(text: str) -> List[int]:
+    """
+    Returns the indexes of the rules whose trigger keywords occur in text, in
+    registration order. The text is upper-cased once and searched for each
+    keyword with plain substring tests, which is several times faster than a
+    case-insensitive regex alternation over the same text.
+    """
+    upper = text.upper()
+    indexes: Set[int] = set()
+    for trigger, rules in rules_by_trigger():
+        if trigger in upper:
+            indexes.update(rules)
+    return sorted(indexes)
+
+
+SELECT_STAR = re.compile(r"SELECT\s+\*", re.IGNORECASE)
+SELECT_KEYWORD = re.compile(r"\bSELECT\b", re.IGNORECASE)
+UPDATE_DELETE_KEYWORD = re.compile(r"\b(UPDATE|DELETE)\b", re.IGNORECASE)
+WHERE_KEYWORD = re.compile(r"\bWHERE\b", re.IGNORECASE)
+WHERE_LITERAL = re.compile(r'WHERE\s+\w+\s*=\s*[\'"]', re.IGNORECASE)
+
+
+@register_rule("Avoid using 'SELECT *'", "SELECT")
+def select_star(text: str) -> bool:
+    return SELECT_STAR.search(text) is not None
+
+
+@register_rule("Missing WHERE clause in UPDATE/DELETE statement", "UPDATE", "DELETE")
+def missing_where(text: str) -> bool:
+    return (
+        UPDATE_DELETE_KEYWORD.search(text) is not None
+        and WHERE_KEYWORD.search(text) is None
+    )
+
+
+@register_rule("Potential nested subquery", "SELECT")
+def nested_subquery(text: str) -> bool:
+    return len(SELECT_KEYWORD.findall(text)) > 1
+
+
+@register_rule("Hardcoded value in WHERE clause", "WHERE")
+def hardcoded_where_value(text: str) -> bool:
+    return WHERE_LITERAL.search(text) is not None
@@ -0,0 +1,164 @@
+import re
+from typing import Iterable, Iterator, List, Optional
+
+# Characters of a statement kept for rule evaluation; scanning continues past
+# the limit so statement boundaries and line numbers stay correct
+MAX_STATEMENT_CHARS = 1_000_000
+
+# Literals closed on the same line are matched whole to keep the scan loop short
+_NORMAL_TOKEN = re.compile(
+    r"""'(?:[^'\\\n]|\\.)*'|"[^"\n]*"|'|"|--|/\*|;|\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$"""
+)
+# Backslash escapes are honoured inside single-quoted strings (MySQL dumps)
+_SINGLE_QUOTE_END = re.compile(r"\\.|'", re.DOTALL)
+_DOUBLE_QUOTE_END = re.compile(r'"')
+_BLOCK_COMMENT_END = re.compile(r"\*/")
+
+_NORMAL = 0
+_SINGLE_QUOTE = 1
+_DOUBLE_QUOTE = 2
+_BLOCK_COMMENT = 3
+_DOLLAR_QUOTE = 4
+
+
+class SQLStatement:
+    """
+    A statement split from SQL source. Comments are replaced by whitespace in
+    text; string literals and dollar-quoted bodies are kept verbatim.
+    masked_text is the same statement with the content of single-quoted
+    literals removed, so rules do not match data inside strings.
+    """
+
+    __slots__ = ("text", "masked_text", "start_line", "end_line")
+
+    def __init__(self, text: str, masked_text: str, start_line: int, end_line: int):
+        self.text = text
+        self.masked_text = masked_text
+        self.start_line = start_line
+        self.end_line = end_line
+
+
+class _StatementBuffer:
+    __slots__ = ("parts", "masked_parts", "size", "start_line", "end_line")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.parts: List[str] = []
+        self.masked_parts: List[str] = []
+        self.size = 0
+        self.start_line: Optional[int] = None
+        self.end_line = 0
+
+    def append(
+        self, piece: str, line_number: int, masked: Optional[str] = None
+    ) -> None:
+        """
+        Adds piece to the statement. masked replaces it in masked_text when
+        given, which is how literal contents are left out.
+        """
+        if not piece:
+            return
+        if self.size < MAX_STATEMENT_CHARS:
+            self.parts.append(piece)
+            self.masked_parts.append(piece if masked is None else masked)
+        self.size += len(piece)
+        if self.end_line != line_number or self.start_line is None:
+            if not piece.isspace():
+                if self.start_line is None:
+                    self.start_line = line_number
+                self.end_line = line_number
+
+    def flush(self) -> Optional[SQLStatement]:
+        statement = None
+        if self.start_line is not None:
+            statement = SQLStatement(
+                "".join(self.parts),
+                "".join(self.masked_parts),
+                self.start_line,
+                self.end_line,
+            )
+        self.reset()
+        return statement
+
+
+def iter_statements(lines: Iterable[str]) -> Iterator[SQLStatement]:
+    """
+    Splits SQL into statements on top-level semicolons, one line at a time, so
+    memory use is bounded by the longest statement rather than the input size.
+    Handles quoted strings and identifiers, line and block comments, and
+    PostgreSQL dollar quoting.
+    """
+    buffer = _StatementBuffer()
+    state = _NORMAL
+    dollar_tag = ""
+
+    for line_number, line in enumerate(lines, start=1):
+        pos = 0
+        end = len(line)
+        while pos < end:
+            if state == _NORMAL:
+                match = _NORMAL_TOKEN.search(line, pos)
+                if match is None:
+                    buffer.append(line[pos:], line_number)
+                    break
+                segment = line[pos : match.start()]
+                token = match.group()
+                pos = match.end()
+                if token == ";":
+                    if buffer.start_line is None and not segment.strip():
+                        # Empty statement
+                        buffer.reset()
+                        continue
+                    buffer.append(segment + token, line_number)
+                    yield buffer.flush()
+                elif token == "--":
+                    buffer.append(
+                        segment + ("\n" if line.endswith("\n") else " "), line_number
+                    )
+                    break
+                elif token == "/*":
+                    buffer.append(segment + " ", line_number)
+                    state = _BLOCK_COMMENT
+                elif len(token) > 1 and token[0] == "'":
+                    buffer.append(segment + token, line_number, segment + "''")
+                else:
+                    buffer.append(segment + token, line_number)
+                    if token == "'":
+                        state = _SINGLE_QUOTE
+                    elif token == '"':
+                        state = _DOUBLE_QUOTE
+                    elif token[0] == "$":
+                        state = _DOLLAR_QUOTE
+                        dollar_tag = token
+            elif state == _BLOCK_COMMENT:
+                match = _BLOCK_COMMENT_END.search(line, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                state = _NORMAL
+            else:
+                if state == _SINGLE_QUOTE:
+                    match = _SINGLE_QUOTE_END.search(line, pos)
+                    while match is not None and match.group() != "'":
+                        match = _SINGLE_QUOTE_END.search(line, match.end())
+                    close = match.end() if match else -1
+                elif state == _DOUBLE_QUOTE:
+                    match = _DOUBLE_QUOTE_END.search(line, pos)
+                    close = match.end() if match else -1
+                else:
+                    close = line.find(dollar_tag, pos)
+                    if close != -1:
+                        close += len(dollar_tag)
+                literal = state == _SINGLE_QUOTE
+                if close == -1:
+                    buffer.append(line[pos:], line_number, "" if literal else None)
+                    break
+                buffer.append(line[pos:close], line_number, "'" if literal else None)
+                pos = close
+                state = _NORMAL
+
+    statement = buffer.flush()
+    if statement is not None:
+        yield statement
@@ -0,0 +1,84 @@
+import dataclasses
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from src.analysis.records import (
+    DefinitionRecord,
+    FileRecord,
+    IssueRecord,
+    SymbolsRecord,
+)
+
+DEAD_CODE_MESSAGE = "Dead code (unused function)"
+
+
+class SymbolIndex:
+    """
+    Repository-wide index of function definitions and the names referenced by
+    calls and imports. Files are keyed by any hashable value (a path, or a
+    database id). Indexes of disjoint sets of files can be built independently,
+    for example in parallel, and merged.
+
+    Matching is by name only: a function counts as used if any file in the
+    repository calls or imports a function of the same name.
+    """
+
+    def __init__(self) -> None:
+        self.definitions: Dict[Hashable, List[DefinitionRecord]] = {}
+        self.used_names: Set[str] = set()
+
+    def add_file(self, file_key: Hashable, symbols: SymbolsRecord) -> None:
+        self.definitions.setdefault(file_key, []).extend(symbols.definitions)
+        self.used_names.update(symbols.references)
+        self.used_names.update(symbols.imports)
+
+    def merge(self, other: "SymbolIndex") -> "SymbolIndex":
+        for file_key, definitions in other.definitions.items():
+            self.definitions.setdefault(file_key, []).extend(definitions)
+        self.used_names |= other.used_names
+        return self
+
+    @classmethod
+    def from_analyses(cls, file_analyses: Iterable[FileRecord]) -> "SymbolIndex":
+        index = cls()
+        for position, analysis in enumerate(file_analyses):
+            if analysis.symbols is not None:
+                index.add_file(position, analysis.symbols)
+        return index
+
+    def dead_definitions(self) -> List[Tuple[Hashable, DefinitionRecord]]:
+        """
+        Returns the definitions whose name is never referenced, grouped by file
+        in insertion order.
+        """
+        return [
+            (file_key, definition)
+            for file_key, definitions in self.definitions.items()
+            for definition in definitions
+            if definition.name not in self.used_names
+        ]
+
+
+def dead_code_issue(definition: DefinitionRecord) -> IssueRecord:
+    return IssueRecord(
+        code=definition.name,
+        line_number=definition.line_number,
+        message=DEAD_CODE_MESSAGE,
+    )
+
+
+def apply_dead_code_issues(file_analyses: List[FileRecord]) -> List[FileRecord]:
+    """
+    Detects unused functions across all the given files and returns the
+    analyses with a dead code issue added to the file defining each of them.
+    """
+    index = SymbolIndex.from_analyses(file_analyses)
+    dead_by_file: Dict[Hashable, List[IssueRecord]] = {}
+    for position, definition in index.dead_definitions():
+        dead_by_file.setdefault(position, []).append(dead_code_issue(definition))
+
+    return [
+        dataclasses.replace(analysis, issues=analysis.issues + dead_by_file[position])
+        if position in dead_by_file
+        else analysis
+        for position, analysis in enumerate(file_analyses)
+    ]
@@ -1,25 +1,35 @@
-from fastapi import APIRouter, Depends, UploadFile, File
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from src.data.database import get_db
+from fastapi import APIRouter, Depends, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from src.data.database import SessionRunner, get_db_runner
 from src.data import repository as repo
-from src.analysis.python_analyzer import PythonCodeAnalyzer
-from src.analysis.sql_analyzer import SQLAnalyzer
-from src.analysis.models import AnalysisResult, FileAnalysis
-from src.evaluation.benchmark import create_synthetic_dataset
-from src.evaluation.metrics import calculate_metrics, GROUND_TRUTH
-from src.visualization.plots import generate_issue_frequency_chart
-import os
-import shutil
+from src.data.analytics import get_analytics_cache, repository_analytics
+from src.api import schemas
+from src.api.export import MEDIA_TYPES, stream_export
+from src.analysis.cache import get_analysis_cache
+from src.analysis.parse_cache import get_parse_cache
+from src.analysis.engine import SUPPORTED_EXTENSIONS, analyze_files
+from src.analysis.symbols import apply_dead_code_issues
+from src.analysis.ingest import UploadTooLargeError, read_zip_sources
+from src.core.config import settings
+from src.core.instrumentation import StageTimings
+from src.jobs.runner import get_job_manager, run_analysis, run_incremental_analysis
+from src.visualization.plots import (
+    CHARTS,
+    data_version,
+    get_chart_cache,
+    load_chart_data,
+    render_chart,
+)
 import zipfile
-from typing import List, Dict, Set
+from typing import Dict, List, Literal, Optional, Set
 
 router = APIRouter()
 
 
 @router.post("/analyze", response_model=int)
 async def analyze_repository(
-    upload_file: UploadFile = File(...), db: Session = Depends(get_db)
+    upload_file: UploadFile = File(...), db: SessionRunner = Depends(get_db_runner)
 ):
     repo_name = (
         upload_file.filename.replace(".zip", "")
@@ -27,83 +37,397 @@ async def analyze_repository(
         else "uploaded_repo"
     )
 
-    # Create a temporary directory to extract the zip file
-    tmp_dir = f"temp_{repo_name}"
-    os.makedirs(tmp_dir, exist_ok=True)
+    # Members are read straight from the archive; blocking work runs off the
+    # event loop and analysis fans out to worker processes
+    timings = StageTimings()
+    try:
+        with timings.time("extract"):
+            sources = await run_in_threadpool(
+                read_zip_sources,
+                upload_file.file,
+                settings.UPLOAD_MAX_MEMBER_BYTES,
+                settings.UPLOAD_MAX_TOTAL_BYTES,
+            )
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"message": str(e)})
+    except zipfile.BadZipFile:
+        return JSONResponse(
+            status_code=400, content={"message": "Upload is not a valid ZIP file"}
+        )
+
+    return await get_job_manager().run(
+        run_analysis, db, repo_name, sources, timings=timings
+    )
+
+
+@router.post("/analyze/{repo_id}/incremental", response_model=int)
+async def analyze_repository_incremental(
+    repo_id: int,
+    upload_file: Optional[UploadFile] = File(None),
+    deleted_paths: List[str] = Form([]),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    sources = []
+    timings = StageTimings()
+    if upload_file is not None:
+        try:
+            with timings.time("extract"):
+                sources = await run_in_threadpool(
+                    read_zip_sources,
+                    upload_file.file,
+                    settings.UPLOAD_MAX_MEMBER_BYTES,
+                    settings.UPLOAD_MAX_TOTAL_BYTES,
+                )
+        except UploadTooLargeError as e:
+            return JSONResponse(status_code=413, content={"message": str(e)})
+        except zipfile.BadZipFile:
+            return JSONResponse(
+                status_code=400, content={"message": "Upload is not a valid ZIP file"}
+            )
+
+    try:
+        return await get_job_manager().run(
+            run_incremental_analysis, db, repo_id, sources, deleted_paths, timings
+        )
+    except LookupError:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+
+
+@router.post("/jobs", response_model=int)
+async def submit_analysis_job(upload_file: UploadFile = File(...)):
+    repo_name = (
+        upload_file.filename.replace(".zip", "")
+        if upload_file.filename
+        else "uploaded_repo"
+    )
+    return await get_job_manager().submit(repo_name, upload_file.file)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: int, db: SessionRunner = Depends(get_db_runner)):
+    db_job = await db.run(repo.get_job, job_id)
+    if not db_job:
+        return JSONResponse(status_code=404, content={"message": "Job not found"})
+    return {
+        "id": db_job.id,
+        "state": db_job.state,
+        "files_done": db_job.files_done,
+        "files_total": db_job.files_total,
+        "repository_id": db_job.repository_id,
+        "error": db_job.error,
+    }
+
+
+@router.get("/results/{repo_id}", response_model=schemas.RepositoryOut)
+async def get_analysis_results(
+    repo_id: int, db: SessionRunner = Depends(get_db_runner)
+):
+    db_repo = await db.run(repo.get_repository, repo_id)
+    if not db_repo:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    summary = await db.run(repo.get_repository_summary, repo_id)
+    return schemas.RepositoryOut(
+        id=db_repo.id,
+        name=db_repo.name,
+        file_count=summary.total_files,
+        function_count=summary.total_functions,
+        issue_count=summary.total_issues,
+    )
 
-    with zipfile.ZipFile(upload_file.file, "r") as zip_ref:
-        zip_ref.extractall(tmp_dir)
 
-    # Start analysis
-    file_analyses: List[FileAnalysis] = []
-    for root, _, files in os.walk(tmp_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if file.endswith(".py"):
-                analyzer = PythonCodeAnalyzer(file_path)
-                file_analyses.append(analyzer.analyze())
-            elif file.endswith(".sql"):
-                analyzer = SQLAnalyzer(file_path)
-                file_analyses.append(analyzer.analyze())
+@router.get("/results/{repo_id}/summary", response_model=schemas.RepositorySummaryOut)
+async def get_result_summary(repo_id: int, db: SessionRunner = Depends(get_db_runner)):
+    summary = await db.run(repo.get_repository_summary, repo_id)
+    if summary is None:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    return summary
+
+
+@router.get("/results/{repo_id}/timings", response_model=schemas.AnalysisTimings)
+async def get_result_timings(repo_id: int, db: SessionRunner = Depends(get_db_runner)):
+    db_repo = await db.run(repo.get_repository, repo_id)
+    if not db_repo:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    if not db_repo.analysis_timings:
+        return JSONResponse(
+            status_code=404,
+            content={"message": "No timings recorded for this repository"},
+        )
+    return db_repo.analysis_timings
+
+
+def _issue_with_path(issue, file_path: str) -> schemas.IssueWithPathOut:
+    return schemas.IssueWithPathOut(
+        **schemas.IssueOut.model_validate(issue).model_dump(), file_path=file_path
+    )
+
+
+@router.get("/results/{repo_id}/trend", response_model=schemas.MetricTrend)
+async def get_metric_trend(
+    repo_id: int,
+    limit: int = Query(30, ge=1, le=1000),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    rows = await db.run(repo.get_metric_trend, repo_id, limit)
+    if not rows:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    return schemas.MetricTrend(
+        project_id=rows[-1][0].project_id,
+        snapshots=[
+            schemas.SnapshotMetrics(
+                repository_id=snapshot.id,
+                sequence=snapshot.sequence,
+                created_at=snapshot.created_at,
+                total_files=summary.total_files,
+                total_loc=summary.total_loc,
+                total_functions=summary.total_functions,
+                total_issues=summary.total_issues,
+                mean_complexity=summary.mean_complexity,
+                max_complexity=summary.max_complexity,
+                issue_counts=summary.issue_counts,
+            )
+            for snapshot, summary in rows
+        ],
+    )
 
-    analysis_result = AnalysisResult(repository_name=repo_name, files=file_analyses)
 
-    # Save to DB
-    db_repo = repo.create_repository(db, name=repo_name)
-    repo.save_analysis_result(db, db_repo.id, analysis_result)
+@router.get(
+    "/results/{repo_id}/compare/{base_repo_id}",
+    response_model=schemas.SnapshotComparison,
+)
+async def compare_snapshots(
+    repo_id: int,
+    base_repo_id: int,
+    limit: int = Query(100, ge=0, le=1000),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    for snapshot_id in (repo_id, base_repo_id):
+        if not await db.run(repo.get_repository, snapshot_id):
+            return JSONResponse(
+                status_code=404,
+                content={"message": f"Repository {snapshot_id} not found"},
+            )
+    comparison = await db.run(repo.compare_snapshots, base_repo_id, repo_id, limit)
+    return schemas.SnapshotComparison(
+        base_repository_id=base_repo_id,
+        repository_id=repo_id,
+        unchanged_files=comparison["unchanged_files"],
+        introduced_count=comparison["introduced_count"],
+        fixed_count=comparison["fixed_count"],
+        introduced=[_issue_with_path(*row) for row in comparison["introduced"]],
+        fixed=[_issue_with_path(*row) for row in comparison["fixed"]],
+    )
 
-    # Cleanup
-    shutil.rmtree(tmp_dir)
 
-    return db_repo.id
+@router.get("/results/{repo_id}/files", response_model=schemas.FilePage)
+async def get_result_files(
+    repo_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    path: Optional[str] = None,
+    min_complexity: Optional[int] = None,
+    max_complexity: Optional[int] = None,
+    db: SessionRunner = Depends(get_db_runner),
+):
+    if not await db.run(repo.get_repository, repo_id):
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    files, next_cursor = await db.run(
+        repo.get_files_page,
+        repo_id,
+        cursor,
+        limit,
+        path,
+        min_complexity,
+        max_complexity,
+    )
+    return schemas.FilePage(
+        items=[schemas.FileOut.model_validate(f) for f in files],
+        next_cursor=next_cursor,
+    )
 
 
-@router.get("/results/{repo_id}")
-def get_analysis_results(repo_id: int, db: Session = Depends(get_db)):
-    db_repo = (
-        db.query(repo.db_models.Repository)
-        .filter(repo.db_models.Repository.id == repo_id)
-        .first()
+@router.get("/results/{repo_id}/issues", response_model=schemas.IssuePage)
+async def get_result_issues(
+    repo_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    message: Optional[str] = None,
+    path: Optional[str] = None,
+    db: SessionRunner = Depends(get_db_runner),
+):
+    if not await db.run(repo.get_repository, repo_id):
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    rows, next_cursor = await db.run(
+        repo.get_issues_page, repo_id, cursor, limit, message, path
+    )
+    return schemas.IssuePage(
+        items=[_issue_with_path(issue, file_path) for issue, file_path in rows],
+        next_cursor=next_cursor,
     )
+
+
+@router.get("/results/{repo_id}/export")
+async def export_results(
+    repo_id: int,
+    kind: Literal[tuple(repo.EXPORT_COLUMNS)] = "issues",
+    format: Literal[tuple(MEDIA_TYPES)] = "ndjson",
+    gzip: bool = False,
+    db: SessionRunner = Depends(get_db_runner),
+):
+    db_repo = await db.run(repo.get_repository, repo_id)
     if not db_repo:
         return JSONResponse(
             status_code=404, content={"message": "Repository not found"}
         )
-    return db_repo
+
+    filename = f"repository-{repo_id}-{kind}.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        stream_export(repo_id, kind, format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/results/{repo_id}/aggregates/issues", response_model=schemas.IssueCounts)
+async def get_issue_counts(repo_id: int, db: SessionRunner = Depends(get_db_runner)):
+    summary = await db.run(repo.get_repository_summary, repo_id)
+    if summary is None:
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    return schemas.IssueCounts(counts=summary.issue_counts)
+
+
+@router.get(
+    "/results/{repo_id}/aggregates/complexity",
+    response_model=schemas.ComplexityHistogram,
+)
+async def get_complexity_histogram(
+    repo_id: int,
+    bucket_size: int = Query(5, ge=1),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    if not await db.run(repo.get_repository, repo_id):
+        return JSONResponse(
+            status_code=404, content={"message": "Repository not found"}
+        )
+    histogram = await db.run(repo.complexity_histogram, repo_id, bucket_size)
+    return schemas.ComplexityHistogram(
+        bucket_size=bucket_size,
+        buckets=[
+            schemas.HistogramBucket(
+                min_complexity=start,
+                max_complexity=start + bucket_size - 1,
+                count=count,
+            )
+            for start, count in histogram
+        ],
+    )
+
+
+@router.get("/results/{repo_id}/analytics", response_model=schemas.RepositoryAnalytics)
+async def get_repository_analytics(
+    repo_id: int,
+    depth: Optional[int] = Query(None, ge=1),
+    directories: int = Query(50, ge=1, le=1000),
+    hotspots: int = Query(20, ge=1, le=1000),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    cache = get_analytics_cache()
+    key = (repo_id, depth, directories, hotspots)
+    analytics = cache.get(key)
+    if analytics is None:
+        db_repo = await db.run(repo.get_repository, repo_id)
+        if not db_repo:
+            return JSONResponse(
+                status_code=404, content={"message": "Repository not found"}
+            )
+        result = await db.run(
+            repository_analytics, repo_id, depth, directories, hotspots
+        )
+        analytics = schemas.RepositoryAnalytics(repository_id=repo_id, **result)
+        cache.put(key, analytics)
+    return analytics
 
 
 @router.get("/evaluation")
 def get_evaluation_metrics():
+    # Only needed by this endpoint, so kept out of application startup
+    from src.evaluation.benchmark import create_synthetic_dataset
+    from src.evaluation.metrics import calculate_metrics, GROUND_TRUTH
+
     create_synthetic_dataset()
 
     analysis_results: Dict[str, Set[str]] = {}
 
-    for file_path in GROUND_TRUTH.keys():
-        if file_path.endswith(".py"):
-            analyzer = PythonCodeAnalyzer(file_path)
-            analysis = analyzer.analyze()
-            issues = {issue.message for issue in analysis.issues}
-            for func in analysis.functions:
-                issues.update({issue.message for issue in func.issues})
-        elif file_path.endswith(".sql"):
-            analyzer = SQLAnalyzer(file_path)
-            analysis = analyzer.analyze()
-            issues = {issue.message for issue in analysis.issues}
-        else:
-            issues = set()
-
-        analysis_results[file_path] = issues
+    file_paths = [path for path in GROUND_TRUTH if path.endswith(SUPPORTED_EXTENSIONS)]
+    for analysis in apply_dead_code_issues(analyze_files(file_paths)):
+        issues = {issue.message for issue in analysis.issues}
+        for func in analysis.functions:
+            issues.update({issue.message for issue in func.issues})
+        analysis_results[analysis.file_path] = issues
+
+    for file_path in GROUND_TRUTH:
+        analysis_results.setdefault(file_path, set())
 
     metrics = calculate_metrics(analysis_results)
     return metrics
 
 
+@router.get("/cache/stats")
+def get_cache_stats():
+    return {
+        "analysis": get_analysis_cache().stats(),
+        "parsed_sources": get_parse_cache().stats(),
+        "charts": get_chart_cache().stats(),
+        "analytics": get_analytics_cache().stats(),
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/visualizations/{repo_id}")
-def get_visualization(repo_id: int, db: Session = Depends(get_db)):
-    chart_path = generate_issue_frequency_chart(db, repo_id)
-    if not chart_path:
+async def get_visualization(
+    repo_id: int,
+    request: Request,
+    chart: Literal[tuple(CHARTS)] = Query("issue_frequency"),
+    db: SessionRunner = Depends(get_db_runner),
+):
+    data = await db.run(load_chart_data, repo_id, chart)
+    if not data:
         return JSONResponse(
             status_code=404, content={"message": "No issues found to generate chart"}
         )
 
-    return {"chart_url": f"/static/{os.path.basename(chart_path)}"}
+    # The ETag is the data version, so unchanged charts are neither rendered
+    # nor sent again
+    version = data_version(chart, data)
+    headers = {"ETag": f'"{version}"', "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    png = await render_chart(repo_id, chart, data, version)
+    return Response(content=png, media_type="image/png", headers=headers)
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import zlib
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from sqlalchemy.orm import Session
+
+from src.data import repository as repo
+from src.data.database import session_scope
+
+# Rows fetched per round trip to the database and encoded per output chunk
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+_json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+Batch = Sequence[Tuple[Any, ...]]
+
+
+def encode_ndjson(columns: List[str], batches: Iterable[Batch]) -> Iterator[bytes]:
+    encode = _json_encoder.encode
+    for batch in batches:
+        lines = [encode(dict(zip(columns, row))) for row in batch]
+        lines.append("")
+        yield "\n".join(lines).encode("utf-8")
+
+
+def encode_csv(columns: List[str], batches: Iterable[Batch]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Compresses a stream of chunks into a single gzip member as they come.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _export_chunks(
+    db: Session, repo_id: int, kind: str, fmt: str, gzip: bool
+) -> Iterator[bytes]:
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    chunks = encode(
+        repo.export_columns(kind),
+        repo.iter_export_rows(db, repo_id, kind, EXPORT_BATCH_SIZE),
+    )
+    return gzip_chunks(chunks) if gzip else chunks
+
+
+def _next_chunk(db: Session, chunks: Iterator[bytes]) -> Optional[bytes]:
+    return next(chunks, None)
+
+
+def _close_chunks(db: Session, chunks: Iterator[bytes]) -> None:
+    chunks.close()
+
+
+async def stream_export(
+    repo_id: int, kind: str, fmt: str, gzip: bool
+) -> AsyncIterator[bytes]:
+    """
+    Yields the encoded rows of one table of a repository. The session is owned
+    by the generator, so it stays open exactly as long as the response is
+    being streamed, and only one batch of rows is held at a time. Chunks are
+    fetched and encoded through the SessionRunner, so the export uses the
+    async engine when ASYNC_DATABASE_URL is set, and a worker thread
+    otherwise.
+    """
+    async with session_scope() as db:
+        chunks = await db.run(_export_chunks, repo_id, kind, fmt, gzip)
+        try:
+            while True:
+                chunk = await db.run(_next_chunk, chunks)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            await db.run(_close_chunks, chunks)
@@ -0,0 +1,175 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class IssueOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    file_id: int
+    line_number: int
+    end_line_number: Optional[int] = None
+    code: str
+    message: str
+
+
+class IssueWithPathOut(IssueOut):
+    file_path: str
+
+
+class FunctionOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    loc: int
+    cyclomatic_complexity: int
+    nesting_depth: int
+    num_arguments: int
+
+
+class FileOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    file_path: str
+    loc: int
+    functions: List[FunctionOut]
+    issues: List[IssueOut]
+
+
+class FilePage(BaseModel):
+    items: List[FileOut]
+    next_cursor: Optional[int] = None
+
+
+class IssuePage(BaseModel):
+    items: List[IssueWithPathOut]
+    next_cursor: Optional[int] = None
+
+
+class RepositoryOut(BaseModel):
+    id: int
+    name: str
+    file_count: int
+    function_count: int
+    issue_count: int
+
+
+class RepositorySummaryOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    repository_id: int
+    total_files: int
+    total_loc: int
+    total_functions: int
+    total_issues: int
+    mean_complexity: float
+    max_complexity: int
+    issue_counts: Dict[str, int]
+
+
+class SnapshotMetrics(BaseModel):
+    repository_id: int
+    sequence: Optional[int] = None
+    created_at: Optional[datetime] = None
+    total_files: int
+    total_loc: int
+    total_functions: int
+    total_issues: int
+    mean_complexity: float
+    max_complexity: int
+    issue_counts: Dict[str, int]
+
+
+class MetricTrend(BaseModel):
+    project_id: Optional[int] = None
+    # Oldest first
+    snapshots: List[SnapshotMetrics]
+
+
+class SnapshotComparison(BaseModel):
+    base_repository_id: int
+    repository_id: int
+    unchanged_files: int
+    introduced_count: int
+    fixed_count: int
+    introduced: List[IssueWithPathOut]
+    fixed: List[IssueWithPathOut]
+
+
+class StageTiming(BaseModel):
+    count: int
+    seconds: float
+
+
+class AnalysisTimings(BaseModel):
+    wall_seconds: float
+    stages: Dict[str, StageTiming]
+
+
+class HistogramBucket(BaseModel):
+    min_complexity: int
+    max_complexity: int
+    count: int
+
+
+class ComplexityHistogram(BaseModel):
+    bucket_size: int
+    buckets: List[HistogramBucket]
+
+
+class IssueCounts(BaseModel):
+    counts: Dict[str, int]
+
+
+class LocBucket(BaseModel):
+    min_loc: int
+    # None for the last, open-ended bucket
+    max_loc: Optional[int] = None
+    count: int
+
+
+class Distribution(BaseModel):
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    # "p50", "p75", "p90", "p95" and "p99"
+    percentiles: Dict[str, float]
+    histogram: Optional[List[LocBucket]] = None
+
+
+class DirectoryMetrics(BaseModel):
+    directory: str
+    files: int
+    loc: int
+    functions: int
+    issues: int
+    mean_complexity: float
+    max_complexity: int
+    issues_per_kloc: float
+
+
+class Hotspot(BaseModel):
+    function_id: int
+    name: str
+    file_path: str
+    cyclomatic_complexity: int
+    loc: int
+    issues_per_kloc: float
+    score: float
+
+
+class RepositoryAnalytics(BaseModel):
+    repository_id: int
+    files: int
+    functions: int
+    issues: int
+    complexity: Distribution
+    function_loc: Distribution
+    file_loc: Distribution
+    directories: List[DirectoryMetrics]
+    hotspots: List[Hotspot]
@@ -0,0 +1,104 @@
+"""
+Benchmark for the single-pass PythonCodeAnalyzer traversal.
+
+Generates Python files with increasingly deep chains of nested functions and
+reports how many AST node visits the analyzer performs compared to the number
+of nodes in the tree, alongside the visit count of the previous multi-pass
+implementation (per-function ``ast.walk`` plus a recursive nesting pass).
+
+Run with ``python -m src.benchmarks.analyzer_traversal``.
+"""
+
+import argparse
+import ast
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from src.analysis.python_analyzer import PythonCodeAnalyzer
+
+
+def generate_nested_source(depth: int, functions: int) -> str:
+    """
+    Builds a module of ``functions`` top-level functions, each containing a
+    chain of ``depth`` nested functions with some branching in every body.
+    """
+    lines: List[str] = []
+    for f in range(functions):
+        for level in range(depth):
+            indent = "    " * level
+            lines.append(f"{indent}def func_{f}_{level}(a, b):")
+            lines.append(f"{indent}    if a and b:")
+            lines.append(f"{indent}        for i in range(a):")
+            lines.append(f"{indent}            print(i)")
+        lines.append("    " * depth + "return a")
+        lines.append(f"func_{f}_0(1, 2)")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_node_visits(tree: ast.AST) -> int:
+    """
+    Counts the node visits performed by the previous analyzer, which walked
+    every function subtree twice on top of the full-tree passes.
+    """
+
+    def subtree_size(node: ast.AST) -> int:
+        return sum(1 for _ in ast.walk(node))
+
+    total = subtree_size(tree)  # generic_visit
+    total += subtree_size(tree)  # call collection in _detect_dead_code
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            # cyclomatic complexity walk + recursive nesting depth walk
+            total += 2 * subtree_size(node)
+    return total
+
+
+def run(depths: List[int], functions: int) -> List[Dict[str, float]]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for depth in depths:
+            file_path = os.path.join(tmp_dir, f"nested_{depth}.py")
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(generate_nested_source(depth, functions))
+
+            analyzer = PythonCodeAnalyzer(file_path)
+            tree_nodes = sum(1 for _ in ast.walk(analyzer.tree))
+            start = time.perf_counter()
+            analyzer.analyze()
+            elapsed = time.perf_counter() - start
+
+            if analyzer.nodes_visited > tree_nodes:
+                raise AssertionError(
+                    f"depth={depth}: visited {analyzer.nodes_visited} nodes "
+                    f"for a tree of {tree_nodes}"
+                )
+            results.append(
+                {
+                    "depth": depth,
+                    "tree_nodes": tree_nodes,
+                    "nodes_visited": analyzer.nodes_visited,
+                    "legacy_node_visits": legacy_node_visits(analyzer.tree),
+                    "seconds": elapsed,
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--functions", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'depth':>6} {'nodes':>9} {'visited':>9} {'legacy':>11} {'seconds':>9}")
+    for row in run(args.depths, args.functions):
+        print(
+            f"{row['depth']:>6} {row['tree_nodes']:>9} {row['nodes_visited']:>9} "
+            f"{row['legacy_node_visits']:>11} {row['seconds']:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark for the LLM explanation pipeline.
+
+Explains a synthetic set of issues with a stub LLM client that answers after a
+fixed latency, comparing the previous approach of one sequential request per
+issue with the batched, deduplicated and concurrent pipeline, then repeats the
+pipeline run against the warm response cache. Finally compares the size of
+the single clustering prompt listing every issue with the tokens used by the
+token-budgeted clustering pipeline.
+
+Run with ``python -m src.benchmarks.llm_explanations``.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+from typing import List
+
+from src.analysis.models import Issue
+from src.llm.cache import ResponseCache
+from src.llm.client import LLMClient
+from src.llm.clustering import ClusteringPipeline
+from src.llm.explain import ExplanationPipeline
+from src.llm.prompts import (
+    create_issue_clustering_prompt,
+    create_issue_explanation_prompt,
+)
+from src.llm.tokens import count_tokens
+
+MESSAGES = [
+    "High cyclomatic complexity",
+    "God function (too long)",
+    "Deeply nested function",
+    "Long parameter list",
+    "Dead code (unused function)",
+]
+
+_ISSUE_NUMBER = re.compile(r"^\s*\[(\d+)\] Issue:", re.MULTILINE)
+
+
+class StubLLMClient(LLMClient):
+    """
+    Answers every prompt after a fixed latency, with one numbered answer per
+    issue for batch prompts.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> str:
+        self.calls += 1
+        numbers = _ISSUE_NUMBER.findall(prompt) or ["1"]
+        return "\n".join(f"[{n}] Explanation {n}." for n in numbers)
+
+    def get_completion(self, prompt: str) -> str:
+        time.sleep(self.latency)
+        return self._answer(prompt)
+
+    async def get_completion_async(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency)
+        return self._answer(prompt)
+
+
+def generate_issues(count: int, distinct_functions: int, seed: int = 0) -> List[Issue]:
+    rng = random.Random(seed)
+    return [
+        Issue(
+            code=f"func_{rng.randrange(distinct_functions)}",
+            line_number=rng.randint(1, 500),
+            message=rng.choice(MESSAGES),
+        )
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=2000)
+    parser.add_argument("--distinct-functions", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--token-budget", type=int, default=3000)
+    parser.add_argument(
+        "--legacy-sample",
+        type=int,
+        default=100,
+        help="issues explained sequentially; the total is extrapolated",
+    )
+    args = parser.parse_args()
+
+    issues = generate_issues(args.issues, args.distinct_functions)
+
+    legacy_client = StubLLMClient(args.latency)
+    start = time.perf_counter()
+    for issue in issues[: args.legacy_sample]:
+        legacy_client.get_completion(create_issue_explanation_prompt(issue))
+    legacy = (time.perf_counter() - start) * len(issues) / args.legacy_sample
+    print(
+        f"one request per issue: {len(issues)} requests, ~{legacy:.2f}s (extrapolated)"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "llm_cache.db"), max_entries=100000)
+        for label in ("pipeline (cold cache)", "pipeline (warm cache)"):
+            client = StubLLMClient(args.latency)
+            pipeline = ExplanationPipeline(
+                client,
+                cache=cache,
+                batch_size=args.batch_size,
+                max_concurrency=args.concurrency,
+            )
+            start = time.perf_counter()
+            explanations = asyncio.run(pipeline.explain(issues))
+            elapsed = time.perf_counter() - start
+            assert len(explanations) == len(issues) and all(explanations)
+            print(f"{label}: {client.calls} requests, {elapsed:.2f}s")
+
+    tokens = count_tokens(create_issue_clustering_prompt(issues))
+    print(f"single clustering prompt: 1 request, {tokens} prompt tokens")
+    pipeline = ClusteringPipeline(
+        StubLLMClient(args.latency),
+        token_budget=args.token_budget,
+        max_concurrency=args.concurrency,
+    )
+    result = asyncio.run(pipeline.summarize(issues))
+    print(
+        f"clustering pipeline: {result.groups} groups, {result.requests} requests, "
+        f"{result.prompt_tokens} prompt tokens, "
+        f"{result.completion_tokens} completion tokens"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark for repository.save_analysis_result.
+
+Builds synthetic analysis results and persists it into a fresh SQLite database
+twice: once with the previous per-file commit/refresh path and once with the
+bulk single-transaction pipeline, reporting rows per second for each.
+
+Run with ``python -m src.benchmarks.persistence``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.analysis.records import FileRecord, FunctionRecord, IssueRecord
+from src.data import models as db_models
+from src.data import repository as repo
+from src.data.database import Base
+
+
+def build_files(
+    files: int, functions_per_file: int, issues_per_file: int
+) -> List[FileRecord]:
+    return [
+        FileRecord(
+            file_path=f"pkg/module_{f}.py",
+            loc=200,
+            functions=[
+                FunctionRecord(
+                    name=f"func_{n}",
+                    loc=10,
+                    cyclomatic_complexity=3,
+                    nesting_depth=2,
+                    num_arguments=2,
+                    issues=[],
+                )
+                for n in range(functions_per_file)
+            ],
+            issues=[
+                IssueRecord(
+                    code=f"func_{n}",
+                    line_number=n + 1,
+                    message="Dead code (unused function)",
+                )
+                for n in range(issues_per_file)
+            ],
+        )
+        for f in range(files)
+    ]
+
+
+def legacy_save_analysis_result(
+    db: Session, repo_id: int, files: List[FileRecord]
+) -> None:
+    """
+    The previous persistence path: one commit and refresh per file, and one
+    ORM object per function and issue.
+    """
+    for file_analysis in files:
+        db_file = db_models.File(
+            repository_id=repo_id,
+            file_path=file_analysis.file_path,
+            loc=file_analysis.loc,
+        )
+        db.add(db_file)
+        db.commit()
+        db.refresh(db_file)
+        for issue in file_analysis.issues:
+            db.add(
+                db_models.Issue(
+                    file_id=db_file.id,
+                    line_number=issue.line_number,
+                    code=issue.code,
+                    message=issue.message,
+                )
+            )
+        for func_metrics in file_analysis.functions:
+            db.add(
+                db_models.Function(
+                    file_id=db_file.id,
+                    name=func_metrics.name,
+                    loc=func_metrics.loc,
+                    cyclomatic_complexity=func_metrics.cyclomatic_complexity,
+                    nesting_depth=func_metrics.nesting_depth,
+                    num_arguments=func_metrics.num_arguments,
+                )
+            )
+    db.commit()
+
+
+def measure(
+    save: Callable[[Session, int, List[FileRecord]], None],
+    files: List[FileRecord],
+    db_path: str,
+) -> Dict[str, float]:
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rows = sum(1 + len(f.functions) + len(f.issues) for f in files)
+    with session_factory() as db:
+        db_repo = repo.create_repository(db, name="benchmark")
+        start = time.perf_counter()
+        save(db, db_repo.id, files)
+        elapsed = time.perf_counter() - start
+    engine.dispose()
+    return {"rows": rows, "seconds": elapsed, "rows_per_second": rows / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=3)
+    args = parser.parse_args()
+
+    files = build_files(args.files, args.functions, args.issues)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, save in (
+            ("legacy", legacy_save_analysis_result),
+            ("bulk", repo.save_analysis_result),
+        ):
+            row = measure(save, files, os.path.join(tmp_dir, f"{label}.db"))
+            print(
+                f"{label:>8}: {row['rows']} rows in {row['seconds']:.3f}s "
+                f"({row['rows_per_second']:.0f} rows/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark for the internal result records.
+
+Builds the same synthetic analysis results as validated pydantic models, as
+analyzers used to produce them, and as the slotted records analyzers produce
+now. For each representation it reports construction time, the memory held by
+the results, the time and payload size of a pickle round trip (as done when
+results come back from worker processes) and of a JSON round trip (as done by
+the analysis cache).
+
+Run with ``python -m src.benchmarks.records``.
+"""
+
+import argparse
+import gc
+import json
+import pickle
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.analysis.models import FileAnalysis, FunctionMetrics, Issue
+from src.analysis.records import FileRecord, FunctionRecord, IssueRecord
+
+MESSAGES = [
+    "High cyclomatic complexity",
+    "God function (too long)",
+    "Deeply nested function",
+    "Long parameter list",
+]
+
+
+def build_models(files: int, functions: int, issues: int) -> List[FileAnalysis]:
+    return [
+        FileAnalysis(
+            file_path=f"pkg/module_{f}.py",
+            loc=400,
+            functions=[
+                FunctionMetrics(
+                    name=f"func_{n}",
+                    loc=12,
+                    cyclomatic_complexity=n % 15,
+                    nesting_depth=n % 5,
+                    num_arguments=n % 7,
+                    issues=[
+                        Issue(
+                            code=f"func_{n}",
+                            line_number=n * 10 + i,
+                            message=MESSAGES[i % len(MESSAGES)],
+                        )
+                        for i in range(issues)
+                    ],
+                )
+                for n in range(functions)
+            ],
+            issues=[],
+        )
+        for f in range(files)
+    ]
+
+
+def build_records(files: int, functions: int, issues: int) -> List[FileRecord]:
+    return [
+        FileRecord(
+            file_path=f"pkg/module_{f}.py",
+            loc=400,
+            functions=[
+                FunctionRecord(
+                    name=f"func_{n}",
+                    loc=12,
+                    cyclomatic_complexity=n % 15,
+                    nesting_depth=n % 5,
+                    num_arguments=n % 7,
+                    issues=[
+                        IssueRecord(
+                            code=f"func_{n}",
+                            line_number=n * 10 + i,
+                            message=MESSAGES[i % len(MESSAGES)],
+                        )
+                        for i in range(issues)
+                    ],
+                )
+                for n in range(functions)
+            ],
+            issues=[],
+        )
+        for f in range(files)
+    ]
+
+
+def timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def measure(
+    build: Callable[[], List[Any]],
+    to_json: Callable[[Any], str],
+    from_json: Callable[[str], Any],
+) -> Dict[str, float]:
+    results, build_seconds = timed(build)
+    del results
+    gc.collect()
+    tracemalloc.start()
+    results = build()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    payload, dump_seconds = timed(
+        lambda: pickle.dumps(results, pickle.HIGHEST_PROTOCOL)
+    )
+    _, load_seconds = timed(lambda: pickle.loads(payload))
+    encoded, encode_seconds = timed(lambda: [to_json(result) for result in results])
+    _, decode_seconds = timed(lambda: [from_json(value) for value in encoded])
+    return {
+        "build_s": build_seconds,
+        "held_mb": held / 1024 / 1024,
+        "pickle_s": dump_seconds + load_seconds,
+        "pickle_mb": len(payload) / 1024 / 1024,
+        "json_s": encode_seconds + decode_seconds,
+        "json_mb": sum(len(value) for value in encoded) / 1024 / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions", type=int, default=20)
+    parser.add_argument("--issues", type=int, default=2)
+    args = parser.parse_args()
+    sizes = (args.files, args.functions, args.issues)
+
+    rows = {
+        "pydantic": measure(
+            lambda: build_models(*sizes),
+            lambda analysis: analysis.model_dump_json(),
+            FileAnalysis.model_validate_json,
+        ),
+        "records": measure(
+            lambda: build_records(*sizes),
+            lambda record: json.dumps(record.to_row(), separators=(",", ":")),
+            lambda value: FileRecord.from_row(json.loads(value)),
+        ),
+    }
+    columns = list(rows["records"])
+    print(f"{'':>10}" + "".join(f"{column:>12}" for column in columns))
+    for label, row in rows.items():
+        print(f"{label:>10}" + "".join(f"{row[column]:>12.3f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
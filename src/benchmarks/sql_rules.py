@@ -0,0 +1,115 @@
+"""
+Microbenchmark for the SQL rule engine.
+
+Generates a multi-megabyte SQL dump, mostly INSERT statements with a sprinkling
+of queries that trigger the rules, and compares the single-scan rule engine
+with the previous implementation that ran one regex pass per rule. The peak
+memory of analyzing the dump from disk is reported to show that statements
+are streamed rather than loaded whole.
+
+Run with ``python -m src.benchmarks.sql_rules``.
+"""
+
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from src.analysis.sql_analyzer import SQLAnalyzer
+
+STATEMENTS = [
+    "SELECT * FROM users;",
+    "DELETE FROM logs;",
+    "UPDATE products SET price = 20 WHERE name = 'Hardcoded';",
+    "SELECT name, (SELECT MAX(price) FROM products) AS max_price FROM users;",
+    "SELECT id, name FROM users WHERE id = 42;",
+]
+
+
+def generate_dump(megabytes: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines: List[str] = []
+    size = 0
+    target = int(megabytes * 1024 * 1024)
+    while size < target:
+        if rng.random() < 0.05:
+            line = rng.choice(STATEMENTS)
+        else:
+            line = (
+                f"INSERT INTO events (id, kind, payload) VALUES "
+                f"({rng.randint(1, 10**9)}, 'click', '{'x' * rng.randint(10, 80)}');"
+            )
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n"
+
+
+def legacy_find_issues(lines: List[str]) -> List[Tuple[int, str]]:
+    """
+    The previous detector: four full passes over the lines, one per rule.
+    """
+    issues = []
+    for i, line in enumerate(lines):
+        if re.search(r"SELECT\s+\*", line, re.IGNORECASE):
+            issues.append((i + 1, "Avoid using 'SELECT *'"))
+    for i, line in enumerate(lines):
+        if re.search(r"\b(UPDATE|DELETE)\b", line, re.IGNORECASE) and not re.search(
+            r"\bWHERE\b", line, re.IGNORECASE
+        ):
+            issues.append((i + 1, "Missing WHERE clause in UPDATE/DELETE statement"))
+    for i, line in enumerate(lines):
+        if len(re.findall(r"\bSELECT\b", line, re.IGNORECASE)) > 1:
+            issues.append((i + 1, "Potential nested subquery"))
+    for i, line in enumerate(lines):
+        if re.search(r'WHERE\s+\w+\s*=\s*[\'"]', line, re.IGNORECASE):
+            issues.append((i + 1, "Hardcoded value in WHERE clause"))
+    return issues
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    print(
+        f"{'MB':>6} {'issues':>8} {'legacy s':>9} {'engine s':>9} "
+        f"{'speedup':>8} {'peak MB':>8}"
+    )
+    for megabytes in args.megabytes:
+        dump = generate_dump(megabytes)
+
+        start = time.perf_counter()
+        expected = legacy_find_issues(dump.splitlines())
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analysis = SQLAnalyzer("dump.sql", dump).analyze()
+        engine_seconds = time.perf_counter() - start
+
+        actual = [(issue.line_number, issue.message) for issue in analysis.issues]
+        if sorted(actual) != sorted(expected):
+            raise AssertionError("rule engine results differ from the legacy detector")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "dump.sql")
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(dump)
+            del dump
+            tracemalloc.start()
+            SQLAnalyzer(file_path).analyze()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        print(
+            f"{megabytes:>6} {len(actual):>8} {legacy_seconds:>9.3f} "
+            f"{engine_seconds:>9.3f} {legacy_seconds / engine_seconds:>7.1f}x "
+            f"{peak / 1024 / 1024:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Import-time benchmark for the API process.
+
+Imports the application in fresh interpreters with ``-X importtime`` and
+reports the median cumulative import time, the slowest imported modules and
+whether any module that should only be loaded on first use was imported at
+startup. Exits with status 1 when a forbidden module is imported or the
+median exceeds --max-ms, so it can guard startup latency in CI.
+
+Run with ``python -m src.benchmarks.startup``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Heavy dependencies that must only be imported when first used
+DEFAULT_FORBIDDEN = [
+    "matplotlib",
+    "numpy",
+    "openai",
+    "tiktoken",
+    "src.evaluation",
+    "src.llm",
+]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Imports module in a fresh interpreter and returns the self and cumulative
+    import time, in microseconds, of every module imported.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def imported_packages(
+    modules: Dict[str, Tuple[int, int]], packages: List[str]
+) -> List[str]:
+    """
+    Returns the packages of which the module itself or a submodule was imported.
+    """
+    return [
+        package
+        for package in packages
+        if any(name == package or name.startswith(package + ".") for name in modules)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, help="fail above this median")
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN)
+    parser.add_argument("--output", help="write the result as JSON to this path")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals_ms = [run[args.module][1] / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+    last = runs[-1]
+    slowest = sorted(last.items(), key=lambda item: item[1][1], reverse=True)
+    forbidden = imported_packages(last, args.forbid)
+
+    print(f"{args.module}: median {median_ms:.1f} ms over {args.runs} runs")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, (self_us, cumulative_us) in slowest[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    failures = []
+    if forbidden:
+        failures.append(f"imported at startup: {', '.join(forbidden)}")
+    if args.max_ms is not None and median_ms > args.max_ms:
+        failures.append(f"median {median_ms:.1f} ms exceeds {args.max_ms:.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "module": args.module,
+                    "runs_ms": totals_ms,
+                    "median_ms": median_ms,
+                    "modules": len(last),
+                    "forbidden_imported": forbidden,
+                },
+                f,
+                indent=2,
+            )
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+End-to-end benchmark on a generated repository.
+
+Generates a seeded synthetic repository of Python and SQL files with planted
+issues (see src.evaluation.generator), then measures:
+
+- per-phase time of a sequential run: parse, metrics, dead code and persist,
+- throughput of the parallel analysis engine on a cold cache,
+- peak RSS of this process and of the largest analysis worker,
+- precision and recall against the generated ground truth.
+
+Results are printed and can be written as JSON; pass a previous result file
+as --baseline to print the change of every timing and throughput figure.
+
+Run with ``python -m src.benchmarks.suite --files 5000 --output result.json``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.analysis import python_analyzer, sql_analyzer
+from src.analysis.engine import (
+    analyze_file,
+    analyze_files,
+    collect_source_files,
+    get_worker_count,
+    shutdown_executor,
+)
+from src.analysis.parse_cache import get_parse_cache
+from src.analysis.records import FileRecord
+from src.analysis.symbols import apply_dead_code_issues
+from src.core.config import settings
+from src.data import repository as repo
+from src.data.database import Base
+from src.evaluation.generator import generate_repository
+from src.evaluation.metrics import calculate_metrics
+
+# Files parsed and analyzed together in the sequential run, bounding the
+# number of parsed files held in the parse cache at once
+PHASE_CHUNK_SIZE = 256
+
+
+def _peak_rss_mb(who: int) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_phases(file_paths: List[str], db_path: str) -> Dict[str, Any]:
+    """
+    Analyzes the files sequentially in this process, timing each phase.
+    Python files are parsed into the parse cache first so the metrics phase
+    only walks the trees; SQL files are streamed, so their parsing is part of
+    the metrics phase.
+    """
+    phases = {"parse": 0.0, "metrics": 0.0, "dead_code": 0.0, "persist": 0.0}
+    parse_cache = get_parse_cache()
+    analyses: List[FileRecord] = []
+    for start in range(0, len(file_paths), PHASE_CHUNK_SIZE):
+        chunk = file_paths[start : start + PHASE_CHUNK_SIZE]
+        parse_cache.clear()
+        began = time.perf_counter()
+        for file_path in chunk:
+            if file_path.endswith(".py"):
+                parse_cache.get(file_path)
+        phases["parse"] += time.perf_counter() - began
+
+        began = time.perf_counter()
+        analyses.extend(analyze_file(file_path) for file_path in chunk)
+        phases["metrics"] += time.perf_counter() - began
+    parse_cache.clear()
+
+    began = time.perf_counter()
+    analyses = apply_dead_code_issues(analyses)
+    phases["dead_code"] = time.perf_counter() - began
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db:
+        db_repo = repo.create_repository(db, name="benchmark")
+        began = time.perf_counter()
+        repo.save_analysis_result(db, db_repo.id, analyses)
+        phases["persist"] = time.perf_counter() - began
+    engine.dispose()
+
+    total = sum(phases.values())
+    return {
+        "seconds": phases,
+        "total_seconds": total,
+        "files_per_second": len(file_paths) / total if total else 0.0,
+        "analyses": analyses,
+    }
+
+
+def run_parallel(file_paths: List[str]) -> Dict[str, float]:
+    """
+    Analyzes the files with the process pool, as the API does, against an
+    empty analysis cache.
+    """
+    began = time.perf_counter()
+    analyze_files(file_paths)
+    elapsed = time.perf_counter() - began
+    shutdown_executor()
+    return {
+        "workers": get_worker_count(),
+        "seconds": elapsed,
+        "files_per_second": len(file_paths) / elapsed if elapsed else 0.0,
+    }
+
+
+def detected_messages(analyses: List[FileRecord]) -> Dict[str, set]:
+    detected = {}
+    for analysis in analyses:
+        messages = {issue.message for issue in analysis.issues}
+        for function in analysis.functions:
+            messages.update(issue.message for issue in function.issues)
+        detected[analysis.file_path] = messages
+    return detected
+
+
+def run_benchmark(
+    files: int, seed: int, sql_ratio: float, issue_rate: float
+) -> Dict[str, Any]:
+    # Resolved first: a child forked later would report this process's peak
+    # memory as its own
+    revision = _git_revision()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Keep the benchmark from reading or filling the real analysis cache
+        settings.ANALYSIS_CACHE_PATH = os.path.join(tmp_dir, "analysis_cache.db")
+        root_dir = os.path.join(tmp_dir, "repo")
+
+        began = time.perf_counter()
+        ground_truth = generate_repository(root_dir, files, seed, sql_ratio, issue_rate)
+        generate_seconds = time.perf_counter() - began
+        file_paths = collect_source_files(root_dir)
+        lines = 0
+        for file_path in file_paths:
+            with open(file_path, "rb") as f:
+                lines += sum(1 for _ in f)
+
+        sequential = run_phases(file_paths, os.path.join(tmp_dir, "benchmark.db"))
+        accuracy = calculate_metrics(
+            detected_messages(sequential.pop("analyses")), ground_truth
+        )
+        parallel = run_parallel(file_paths)
+
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "analyzer_versions": {
+            "python": python_analyzer.ANALYZER_VERSION,
+            "sql": sql_analyzer.ANALYZER_VERSION,
+        },
+        "config": {
+            "files": files,
+            "seed": seed,
+            "sql_ratio": sql_ratio,
+            "issue_rate": issue_rate,
+        },
+        "repository": {"files": len(file_paths), "lines": lines},
+        "generate_seconds": generate_seconds,
+        "sequential": sequential,
+        "parallel": parallel,
+        "peak_rss_mb": {
+            "main": _peak_rss_mb(resource.RUSAGE_SELF),
+            "workers": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        },
+        "accuracy": accuracy,
+    }
+
+
+def _numeric_leaves(result: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    leaves = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            leaves.update(_numeric_leaves(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            leaves[name] = value
+    return leaves
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """
+    Describes the relative change of every timing, throughput and memory
+    figure between a baseline result and this one.
+    """
+    current = _numeric_leaves(result)
+    previous = _numeric_leaves(baseline)
+    lines = []
+    for name, value in current.items():
+        if not name.startswith(("sequential.", "parallel.", "peak_rss_mb.")):
+            continue
+        before = previous.get(name)
+        if before:
+            change = (value - before) / before
+            lines.append(f"{name}: {before:.3f} -> {value:.3f} ({change:+.1%})")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sql-ratio", type=float, default=0.1)
+    parser.add_argument("--issue-rate", type=float, default=0.2)
+    parser.add_argument("--output", help="write the result as JSON to this path")
+    parser.add_argument("--baseline", help="previous JSON result to compare with")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.files, args.seed, args.sql_ratio, args.issue_rate)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("\n".join(compare(result, baseline)))
+
+
+if __name__ == "__main__":
+    main()
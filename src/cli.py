@@ -0,0 +1,248 @@
+"""
+Command-line batch analyzer.
+
+Analyzes local directories without going through the API: every directory is
+analyzed as one repository, in the shared pool of analysis workers, and its
+results are written as NDJSON, one line per file:
+
+    {"repository": "<name>", "file": <FileAnalysis>}
+
+Ignored paths (.gitignore rules, virtual environments, build and cache
+directories) are skipped during the walk. Results can be loaded into the
+database right away with --load-db, or later from the NDJSON output with the
+load command.
+
+    python -m src.cli analyze repos/* --output results.ndjson
+    python -m src.cli analyze --repos-from repos.txt --workers 8 --load-db
+    python -m src.cli load results.ndjson
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from itertools import groupby
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.analysis.engine import (
+    SkippedFile,
+    SourceFile,
+    analyze_sources,
+    shutdown_executor,
+)
+from src.analysis.ignore import walk_source_files
+from src.analysis.models import FileAnalysis
+from src.analysis.records import FileRecord
+from src.analysis.symbols import apply_dead_code_issues
+from src.core.config import settings
+from src.core.instrumentation import StageTimings
+
+logger = logging.getLogger("src.cli")
+
+
+def read_sources(
+    root_dir: str, extra_patterns: Optional[Iterable[str]] = None
+) -> List[SourceFile]:
+    """
+    Reads the analyzable, non-ignored files below root_dir, keyed by their
+    path relative to it as for uploaded archives. Files that are not valid
+    UTF-8 are skipped.
+    """
+    sources: List[SourceFile] = []
+    for file_path in walk_source_files(root_dir, extra_patterns):
+        with open(os.path.join(root_dir, file_path), "rb") as f:
+            content = f.read()
+        try:
+            content.decode("utf-8")
+        except UnicodeDecodeError:
+            logger.warning(
+                "Skipping %s: not valid UTF-8", os.path.join(root_dir, file_path)
+            )
+            continue
+        sources.append((file_path, content))
+    return sources
+
+
+def analyze_directory(
+    root_dir: str,
+    extra_patterns: Optional[Iterable[str]] = None,
+    timings: Optional[StageTimings] = None,
+) -> List[FileRecord]:
+    """
+    Analyzes a directory as one repository, dead code included. Files that
+    cannot be parsed are skipped, as are those that are not valid UTF-8.
+    """
+    timings = timings if timings is not None else StageTimings()
+    with timings.time("walk"):
+        sources = read_sources(root_dir, extra_patterns)
+    skipped: List[SkippedFile] = []
+    analyses = analyze_sources(sources, timings, skipped=skipped)
+    for file_path, error in skipped:
+        logger.warning("Skipping %s: %s", os.path.join(root_dir, file_path), error)
+    with timings.time("dead_code"):
+        return apply_dead_code_issues(analyses)
+
+
+def to_ndjson(repository: str, analysis: FileRecord) -> str:
+    return json.dumps(
+        {"repository": repository, "file": analysis.to_model().model_dump(mode="json")},
+        separators=(",", ":"),
+    )
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Tuple[str, FileRecord]]:
+    for line in lines:
+        if line.strip():
+            row = json.loads(line)
+            yield (
+                row["repository"],
+                FileRecord.from_model(FileAnalysis.model_validate(row["file"])),
+            )
+
+
+def _repository_name(root_dir: str) -> str:
+    return os.path.basename(os.path.normpath(os.path.abspath(root_dir)))
+
+
+def load_repository(
+    name: str, files: List[FileRecord], timings: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Bulk-loads the results of one repository into the database as a new
+    repository, returning its id. timings, if given, are stored with it as
+    for analyses run by the API. The CLI runs no event loop, so it always
+    writes through the synchronous engine of DATABASE_URL; ASYNC_DATABASE_URL
+    only applies to the API.
+    """
+    from src.data import repository as repo
+    from src.data.database import SessionLocal
+
+    with SessionLocal() as db:
+        db_repo = repo.create_repository(db, name=name)
+        repo.save_analysis_result(db, db_repo.id, files)
+        if timings is not None:
+            repo.save_analysis_timings(db, db_repo.id, timings)
+        return db_repo.id
+
+
+def _prepare_database() -> None:
+    from src.data import models  # noqa: F401 - registers the tables
+    from src.data.database import Base, engine
+
+    Base.metadata.create_all(bind=engine)
+
+
+def _open_output(path: Optional[str]) -> IO[str]:
+    return open(path, "w", encoding="utf-8") if path else sys.stdout
+
+
+def _list_directories(args: argparse.Namespace) -> List[str]:
+    directories = list(args.directories)
+    if args.repos_from:
+        with open(args.repos_from, encoding="utf-8") as f:
+            directories.extend(line.strip() for line in f if line.strip())
+    return directories
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    if args.workers:
+        settings.ANALYSIS_WORKERS = args.workers
+    if args.load_db:
+        _prepare_database()
+
+    directories = _list_directories(args)
+    if not directories:
+        logger.error("No directories to analyze")
+        return 2
+
+    failures = 0
+    output = _open_output(args.output)
+    try:
+        for root_dir in directories:
+            name = _repository_name(root_dir)
+            started = time.perf_counter()
+            timings = StageTimings()
+            try:
+                analyses = analyze_directory(root_dir, args.exclude, timings)
+            except Exception:
+                failures += 1
+                logger.exception("Analysis of %s failed", root_dir)
+                continue
+            for analysis in analyses:
+                output.write(to_ndjson(name, analysis) + "\n")
+            output.flush()
+
+            wall_seconds = time.perf_counter() - started
+            message = f"{root_dir}: {len(analyses)} files in {wall_seconds:.2f}s"
+            if args.load_db:
+                repo_id = load_repository(
+                    name,
+                    analyses,
+                    {"wall_seconds": wall_seconds, "stages": timings.to_dict()},
+                )
+                message += f", loaded as repository {repo_id}"
+            logger.info(message)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        shutdown_executor()
+    return 1 if failures else 0
+
+
+def run_load(args: argparse.Namespace) -> int:
+    _prepare_database()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        # Lines of a repository are contiguous in the output of analyze
+        for name, rows in groupby(read_ndjson(source), key=lambda row: row[0]):
+            files = [analysis for _, analysis in rows]
+            repo_id = load_repository(name, files)
+            logger.info(
+                "%s: %d files loaded as repository %d", name, len(files), repo_id
+            )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli", description="Batch static code analyzer."
+    )
+    parser.add_argument("--quiet", action="store_true", help="only log errors")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="analyze local directories")
+    analyze.add_argument("directories", nargs="*", help="one repository per directory")
+    analyze.add_argument("--repos-from", help="file listing one directory per line")
+    analyze.add_argument("--output", "-o", help="NDJSON output file (default: stdout)")
+    analyze.add_argument("--workers", type=int, help="analysis worker processes")
+    analyze.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="extra gitignore-style pattern to skip (repeatable)",
+    )
+    analyze.add_argument(
+        "--load-db", action="store_true", help="also load the results into DATABASE_URL"
+    )
+    analyze.set_defaults(handler=run_analyze)
+
+    load = commands.add_parser("load", help="load NDJSON results into the database")
+    load.add_argument("input", help="NDJSON file written by analyze, or - for stdin")
+    load.set_defaults(handler=run_load)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.ERROR if args.quiet else logging.INFO,
+        format="%(levelname)s %(message)s",
+        stream=sys.stderr,
+    )
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
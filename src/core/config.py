@@ -3,8 +3,52 @@ from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test.db"
+    # Optional URL with an async driver; when set, async endpoints use it
+    ASYNC_DATABASE_URL: str = ""
+    # Connection pool settings for non-SQLite databases
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
     OPENAI_API_KEY: str = "your_openai_api_key"
     OPENAI_API_BASE: str = "https://api.openai.com/v1"
+    OPENAI_MODEL: str = "gpt-3.5-turbo"
+    # LLM explanations: issues per prompt, parallel requests and request rate
+    LLM_BATCH_SIZE: int = 10
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_REQUESTS_PER_MINUTE: int = 60
+    # Issue clustering: prompt token budget and how much of each group is sent
+    LLM_CLUSTER_TOKEN_BUDGET: int = 3000
+    LLM_CLUSTER_SAMPLES_PER_GROUP: int = 3
+    LLM_CLUSTER_MAX_GROUPS: int = 200
+    # Persistent cache of LLM responses keyed by prompt hash
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    # Number of analysis worker processes; 0 uses the CPU count
+    ANALYSIS_WORKERS: int = 0
+    # Number of files handed to a worker per task
+    ANALYSIS_CHUNK_SIZE: int = 32
+    # Limits on the uncompressed size of uploaded archives
+    UPLOAD_MAX_MEMBER_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_TOTAL_BYTES: int = 512 * 1024 * 1024
+    # Background analysis jobs
+    JOBS_UPLOAD_DIR: str = "./job_uploads"
+    MAX_CONCURRENT_JOBS: int = 2
+    # Persistent cache of per-file results keyed by content hash
+    ANALYSIS_CACHE_PATH: str = "./analysis_cache.db"
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 100000
+    # Opt-in cProfile of a sample of analyses; the slowest ones are kept
+    PROFILE_ANALYSES: bool = False
+    PROFILE_SAMPLE_RATE: float = 1.0
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_KEEP_SLOWEST: int = 10
+    # Memory cap of the in-process cache of parsed Python files
+    PARSE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    # Chart rendering worker processes and number of rendered charts kept
+    CHART_WORKERS: int = 1
+    CHART_CACHE_MAX_ENTRIES: int = 256
+    # Number of computed repository analytics kept in memory
+    ANALYTICS_CACHE_MAX_ENTRIES: int = 128
 
     class Config:
         env_file = ".env"
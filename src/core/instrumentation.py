@@ -0,0 +1,187 @@
+import cProfile
+import heapq
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.core.config import settings
+
+
+class StageTimings:
+    """
+    Call count and time spent per pipeline stage, for one analysis or for a
+    batch of files analyzed by a worker process, which returns its timings to
+    be merged into those of the analysis.
+    """
+
+    __slots__ = ("stages",)
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float, count: int = 1) -> None:
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [count, seconds]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def seconds(self, stage: str) -> float:
+        entry = self.stages.get(stage)
+        return entry[1] if entry else 0.0
+
+    def merge(self, other: "StageTimings") -> "StageTimings":
+        for stage, (count, seconds) in other.stages.items():
+            self.add(stage, seconds, int(count))
+        return self
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {"count": int(count), "seconds": seconds}
+            for stage, (count, seconds) in sorted(self.stages.items())
+        }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """
+    Process-wide totals of stage timings and event counters, rendered in the
+    Prometheus text exposition format.
+    """
+
+    PREFIX = "code_analyzer"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages = StageTimings()
+        self._counters: Dict[str, float] = {}
+
+    def record(self, timings: StageTimings) -> None:
+        with self._lock:
+            self._stages.merge(timings)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def render(self) -> str:
+        with self._lock:
+            stages = {
+                stage: list(entry) for stage, entry in self._stages.stages.items()
+            }
+            counters = dict(self._counters)
+
+        lines = [
+            f"# HELP {self.PREFIX}_stage_seconds_total Time spent in each analysis stage.",
+            f"# TYPE {self.PREFIX}_stage_seconds_total counter",
+        ]
+        for stage, (_, seconds) in sorted(stages.items()):
+            lines.append(
+                f'{self.PREFIX}_stage_seconds_total{{stage="{_escape_label(stage)}"}} {seconds}'
+            )
+        lines += [
+            f"# HELP {self.PREFIX}_stage_calls_total Number of times each analysis stage ran.",
+            f"# TYPE {self.PREFIX}_stage_calls_total counter",
+        ]
+        for stage, (count, _) in sorted(stages.items()):
+            lines.append(
+                f'{self.PREFIX}_stage_calls_total{{stage="{_escape_label(stage)}"}} {int(count)}'
+            )
+        for name, value in sorted(counters.items()):
+            lines += [
+                f"# TYPE {self.PREFIX}_{name} counter",
+                f"{self.PREFIX}_{name} {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class SlowestProfiles:
+    """
+    Keeps on disk the cProfile output of the slowest analyses profiled since
+    startup, deleting a profile once keep slower ones have been written.
+    """
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = keep
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def offer(
+        self, profiler: cProfile.Profile, seconds: float, label: str
+    ) -> Optional[str]:
+        """
+        Writes the profile if the analysis is among the slowest, returning
+        the path written.
+        """
+        with self._lock:
+            if self.keep <= 0 or (
+                len(self._heap) >= self.keep and seconds <= self._heap[0][0]
+            ):
+                return None
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{label}-{seconds:.3f}s.prof")
+            profiler.dump_stats(path)
+            heapq.heappush(self._heap, (seconds, path))
+            if len(self._heap) > self.keep:
+                _, evicted = heapq.heappop(self._heap)
+                try:
+                    os.remove(evicted)
+                except FileNotFoundError:
+                    pass
+            return path
+
+
+_profiles: Optional[SlowestProfiles] = None
+
+
+def get_slowest_profiles() -> SlowestProfiles:
+    global _profiles
+    if _profiles is None:
+        _profiles = SlowestProfiles(settings.PROFILE_DIR, settings.PROFILE_KEEP_SLOWEST)
+    return _profiles
+
+
+def start_profiler() -> Optional[cProfile.Profile]:
+    """
+    Returns a profiler for the next analysis when profiling is enabled and
+    the analysis is sampled, otherwise None.
+    """
+    if not settings.PROFILE_ANALYSES or random.random() >= settings.PROFILE_SAMPLE_RATE:
+        return None
+    return cProfile.Profile()
+
+
+def finish_analysis(
+    timings: StageTimings,
+    seconds: float,
+    profiler: Optional[cProfile.Profile] = None,
+    label: str = "analysis",
+) -> None:
+    """
+    Adds a finished analysis to the process-wide metrics and keeps its
+    profile if it is among the slowest.
+    """
+    REGISTRY.record(timings)
+    REGISTRY.increment("analyses_total")
+    REGISTRY.increment("analysis_seconds_total", seconds)
+    if profiler is not None:
+        get_slowest_profiles().offer(profiler, seconds, label)
@@ -0,0 +1,259 @@
+import threading
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.core.config import settings
+from src.data import repository as repo
+
+PERCENTILES = (50, 75, 90, 95, 99)
+
+# Lower bounds of the LOC histogram buckets; the last bucket is open-ended
+LOC_BUCKETS = (0, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _int_array(rows: Sequence[Tuple[int, ...]], width: int):
+    """
+    Converts rows of integers to a (len(rows), width) array without building
+    an intermediate Python object per value.
+    """
+    import numpy as np
+
+    flat = np.fromiter(
+        chain.from_iterable(rows), dtype=np.int64, count=len(rows) * width
+    )
+    return flat.reshape(len(rows), width)
+
+
+def _distribution(values, buckets: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+    import numpy as np
+
+    if values.size:
+        points = np.percentile(values, PERCENTILES)
+        result: Dict[str, Any] = {
+            "count": int(values.size),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, points)},
+        }
+    else:
+        result = {
+            "count": 0,
+            "mean": 0.0,
+            "std": 0.0,
+            "min": 0.0,
+            "max": 0.0,
+            "percentiles": {f"p{p}": 0.0 for p in PERCENTILES},
+        }
+    if buckets is not None:
+        edges = np.asarray(buckets)
+        counts = np.bincount(
+            np.searchsorted(edges, values, side="right") - 1, minlength=len(edges)
+        )
+        upper = [int(edge) - 1 for edge in edges[1:]] + [None]
+        result["histogram"] = [
+            {"min_loc": int(lower), "max_loc": high, "count": int(count)}
+            for lower, high, count in zip(edges, upper, counts)
+        ]
+    return result
+
+
+def directory_of(file_path: str, depth: Optional[int] = None) -> str:
+    """
+    Returns the directory of a file, truncated to its first depth components
+    when depth is given, "." for files at the repository root.
+    """
+    parts = file_path.split("/")[:-1]
+    if depth is not None:
+        parts = parts[:depth]
+    return "/".join(parts) or "."
+
+
+def compute_analytics(
+    files: Sequence[Tuple[int, str, int]],
+    functions: Sequence[Tuple[int, int, int, int]],
+    issue_counts: Sequence[Tuple[int, int]],
+    depth: Optional[int] = None,
+    max_directories: int = 50,
+    max_hotspots: int = 20,
+) -> Dict[str, Any]:
+    """
+    Computes repository-wide distributions, per-directory aggregates and the
+    hotspot ranking from the rows of get_file_metric_rows,
+    get_function_metric_rows and count_issues_by_file.
+
+    Every function gets a hotspot score of complexity x LOC x (1 + issue
+    density), the issue density being the issues per 1000 lines of its file,
+    so functions of files without issues are still ranked by size and
+    complexity. Hotspots refer to functions by id; their names are resolved
+    by the caller for the few that are returned.
+    """
+    import numpy as np
+
+    file_ids = np.fromiter((row[0] for row in files), dtype=np.int64, count=len(files))
+    file_loc = np.fromiter(
+        (row[2] or 0 for row in files), dtype=np.int64, count=len(files)
+    )
+    # File ids are sorted, so rows referring to files are mapped to file
+    # positions with a binary search
+    order = np.argsort(file_ids, kind="stable")
+    file_ids, file_loc = file_ids[order], file_loc[order]
+    file_paths = [files[i][1] for i in order]
+
+    file_issues = np.zeros(len(files), dtype=np.int64)
+    if issue_counts:
+        counts = _int_array(issue_counts, 2)
+        file_issues[np.searchsorted(file_ids, counts[:, 0])] = counts[:, 1]
+    issue_density = file_issues * 1000.0 / np.maximum(file_loc, 1)
+
+    function_rows = _int_array(functions, 4)
+    function_ids = function_rows[:, 0]
+    function_file = np.searchsorted(file_ids, function_rows[:, 1])
+    function_loc = function_rows[:, 2]
+    complexity = function_rows[:, 3]
+
+    # Per-directory aggregates
+    directories, directory_index = np.unique(
+        np.array([directory_of(path, depth) for path in file_paths], dtype=object),
+        return_inverse=True,
+    )
+    directory_index = directory_index.reshape(-1)
+    n = len(directories)
+    dir_files = np.bincount(directory_index, minlength=n)
+    dir_loc = np.bincount(directory_index, weights=file_loc, minlength=n)
+    dir_issues = np.bincount(directory_index, weights=file_issues, minlength=n)
+    function_directory = directory_index[function_file]
+    dir_functions = np.bincount(function_directory, minlength=n)
+    dir_complexity = np.bincount(function_directory, weights=complexity, minlength=n)
+    dir_max_complexity = np.zeros(n, dtype=np.int64)
+    np.maximum.at(dir_max_complexity, function_directory, complexity)
+    largest = np.argsort(-dir_loc, kind="stable")[:max_directories]
+
+    # Hotspots: the top scores are selected in linear time, then sorted
+    scores = complexity * function_loc * (1.0 + issue_density[function_file])
+    k = min(max_hotspots, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k] if k else np.array([], dtype=np.int64)
+    top = top[np.lexsort((function_ids[top], -scores[top]))]
+
+    return {
+        "files": len(files),
+        "functions": len(functions),
+        "issues": int(file_issues.sum()),
+        "complexity": _distribution(complexity),
+        "function_loc": _distribution(function_loc, LOC_BUCKETS),
+        "file_loc": _distribution(file_loc, LOC_BUCKETS),
+        "directories": [
+            {
+                "directory": directories[i],
+                "files": int(dir_files[i]),
+                "loc": int(dir_loc[i]),
+                "functions": int(dir_functions[i]),
+                "issues": int(dir_issues[i]),
+                "mean_complexity": (
+                    float(dir_complexity[i] / dir_functions[i])
+                    if dir_functions[i]
+                    else 0.0
+                ),
+                "max_complexity": int(dir_max_complexity[i]),
+                "issues_per_kloc": float(dir_issues[i] * 1000.0 / max(dir_loc[i], 1)),
+            }
+            for i in largest
+        ],
+        "hotspots": [
+            {
+                "function_id": int(function_ids[i]),
+                "file_path": file_paths[function_file[i]],
+                "cyclomatic_complexity": int(complexity[i]),
+                "loc": int(function_loc[i]),
+                "issues_per_kloc": float(issue_density[function_file[i]]),
+                "score": float(scores[i]),
+            }
+            for i in top
+        ],
+    }
+
+
+def repository_analytics(
+    db: Session,
+    repo_id: int,
+    depth: Optional[int] = None,
+    max_directories: int = 50,
+    max_hotspots: int = 20,
+) -> Dict[str, Any]:
+    """
+    Loads the file, function and issue columns of a repository in bulk and
+    computes its analytics (see compute_analytics).
+    """
+    analytics = compute_analytics(
+        repo.get_file_metric_rows(db, repo_id),
+        repo.get_function_metric_rows(db, repo_id),
+        repo.count_issues_by_file(db, repo_id),
+        depth,
+        max_directories,
+        max_hotspots,
+    )
+    names = repo.get_function_names(
+        db, [hotspot["function_id"] for hotspot in analytics["hotspots"]]
+    )
+    for hotspot in analytics["hotspots"]:
+        hotspot["name"] = names[hotspot["function_id"]]
+    return analytics
+
+
+class AnalyticsCache:
+    """
+    In-process cache of computed analytics keyed by repository and query
+    parameters. Stored repositories are never modified (an incremental
+    analysis creates a new one), so entries stay valid until evicted; the
+    least recently used are evicted beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[AnalyticsCache] = None
+
+
+def get_analytics_cache() -> AnalyticsCache:
+    global _cache
+    if _cache is None:
+        _cache = AnalyticsCache(settings.ANALYTICS_CACHE_MAX_ENTRIES)
+    return _cache
@@ -1,17 +1,66 @@
-from sqlalchemy import create_engine
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, TypeVar, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from src.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}
-    if "sqlite" in settings.DATABASE_URL
-    else {},
-)
+T = TypeVar("T")
+
+# Applied to every SQLite connection; WAL lets readers proceed during writes
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": "5000",
+    "temp_store": "MEMORY",
+    "cache_size": "-64000",
+}
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _apply_sqlite_pragmas(sync_engine: Engine) -> None:
+    @event.listens_for(sync_engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+if settings.DATABASE_URL.startswith("sqlite"):
+    _apply_sqlite_pragmas(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Optional async engine, enabled by setting ASYNC_DATABASE_URL to a URL with an
+# async driver, e.g. postgresql+asyncpg://... or sqlite+aiosqlite:///...
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DATABASE_URL:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL, **_engine_options(settings.ASYNC_DATABASE_URL)
+    )
+    if settings.ASYNC_DATABASE_URL.startswith("sqlite"):
+        _apply_sqlite_pragmas(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
 
 def get_db():
     db = SessionLocal()
@@ -19,3 +68,40 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class SessionRunner:
+    """
+    Runs functions taking a synchronous Session, such as those in
+    src.data.repository, from async code without blocking the event loop.
+    With an AsyncSession they run through run_sync and the async driver;
+    otherwise they run in a worker thread.
+    """
+
+    def __init__(self, session: Union[Session, Any]):
+        self.session = session
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if isinstance(self.session, Session):
+            return await asyncio.to_thread(func, self.session, *args, **kwargs)
+        return await self.session.run_sync(
+            lambda session: func(session, *args, **kwargs)
+        )
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[SessionRunner]:
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield SessionRunner(session)
+        return
+    db = SessionLocal()
+    try:
+        yield SessionRunner(db)
+    finally:
+        await asyncio.to_thread(db.close)
+
+
+async def get_db_runner() -> AsyncIterator[SessionRunner]:
+    async with session_scope() as runner:
+        yield runner
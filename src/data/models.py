@@ -1,28 +1,76 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text
+from datetime import datetime
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    Float,
+    ForeignKey,
+    Index,
+    Text,
+)
 from sqlalchemy.orm import relationship
 from src.data.database import Base
 
 
+class Project(Base):
+    """
+    A repository analyzed over time. Every analysis of it is stored as a
+    Repository row, a snapshot, numbered in order by its sequence.
+    """
+
+    __tablename__ = "projects"
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    snapshots = relationship("Repository", back_populates="project")
+
+
 class Repository(Base):
     __tablename__ = "repositories"
+    __table_args__ = (
+        Index(
+            "ix_repositories_project_id_sequence", "project_id", "sequence", unique=True
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    # Position of this snapshot among the analyses of its project, from 1
+    sequence = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+    # Time spent per pipeline stage by the analysis that created it
+    analysis_timings = Column(JSON, nullable=True)
+    project = relationship("Project", back_populates="snapshots")
     files = relationship("File", back_populates="repository")
+    summary = relationship(
+        "RepositorySummary", back_populates="repository", uselist=False
+    )
 
 
 class File(Base):
     __tablename__ = "files"
+    __table_args__ = (
+        Index("ix_files_repository_id_file_path", "repository_id", "file_path"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     repository_id = Column(Integer, ForeignKey("repositories.id"))
     file_path = Column(String)
     loc = Column(Integer)
+    # Hash of the content and analyzer configuration: files with equal hashes
+    # in two snapshots have identical results
+    content_hash = Column(String(64), nullable=True)
     repository = relationship("Repository", back_populates="files")
     functions = relationship("Function", back_populates="file")
     issues = relationship("Issue", back_populates="file")
+    symbols = relationship("Symbol", back_populates="file")
 
 
 class Function(Base):
     __tablename__ = "functions"
+    __table_args__ = (
+        Index("ix_functions_file_id_complexity", "file_id", "cyclomatic_complexity"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     file_id = Column(Integer, ForeignKey("files.id"))
     name = Column(String)
@@ -35,9 +83,62 @@ class Function(Base):
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        Index("ix_issues_file_id_message", "file_id", "message"),
+        Index("ix_issues_message", "message"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     file_id = Column(Integer, ForeignKey("files.id"))
     line_number = Column(Integer)
+    end_line_number = Column(Integer, nullable=True)
     code = Column(String)
     message = Column(Text)
     file = relationship("File", back_populates="issues")
+
+
+class RepositorySummary(Base):
+    """
+    Per-repository totals maintained when results are saved, so dashboards
+    can read them without scanning the files, functions and issues tables.
+    """
+
+    __tablename__ = "repository_summaries"
+    repository_id = Column(Integer, ForeignKey("repositories.id"), primary_key=True)
+    total_files = Column(Integer, default=0)
+    total_loc = Column(Integer, default=0)
+    total_functions = Column(Integer, default=0)
+    total_issues = Column(Integer, default=0)
+    mean_complexity = Column(Float, default=0.0)
+    max_complexity = Column(Integer, default=0)
+    # Issue message -> number of issues
+    issue_counts = Column(JSON, default=dict)
+    repository = relationship("Repository", back_populates="summary")
+
+
+class Symbol(Base):
+    """
+    A function definition, call reference or imported name found in a file,
+    used to detect dead code across the repository.
+    """
+
+    __tablename__ = "symbols"
+    id = Column(Integer, primary_key=True, index=True)
+    file_id = Column(Integer, ForeignKey("files.id"), index=True)
+    kind = Column(String)  # "definition", "reference" or "import"
+    name = Column(String)
+    line_number = Column(Integer, nullable=True)
+    file = relationship("File", back_populates="symbols")
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    repository_name = Column(String)
+    upload_path = Column(String)
+    state = Column(String, index=True, default="queued")
+    files_total = Column(Integer, default=0)
+    files_done = Column(Integer, default=0)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
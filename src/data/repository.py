@@ -1,46 +1,787 @@
+from typing import Any, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.orm import Session
 from src.data import models as db_models
-from src.analysis import models as analysis_models
+from src.analysis.records import DefinitionRecord, FileRecord, SymbolsRecord
+from src.analysis.symbols import DEAD_CODE_MESSAGE, SymbolIndex
+
+# Rows sent per INSERT statement when persisting analysis results
+BULK_INSERT_BATCH_SIZE = 1000
+
+# Times a snapshot is numbered again when a concurrent one took its sequence
+CREATE_REPOSITORY_ATTEMPTS = 5
+
+# Exportable tables and their exported columns, besides the file path
+EXPORT_COLUMNS = {
+    "files": (db_models.File, ("id", "loc")),
+    "functions": (
+        db_models.Function,
+        (
+            "id",
+            "file_id",
+            "name",
+            "loc",
+            "cyclomatic_complexity",
+            "nesting_depth",
+            "num_arguments",
+        ),
+    ),
+    "issues": (
+        db_models.Issue,
+        ("id", "file_id", "line_number", "end_line_number", "code", "message"),
+    ),
+}
+
+
+def get_or_create_project(db: Session, name: str) -> db_models.Project:
+    """
+    Returns the project of that name, created if missing. The project row is
+    locked until the transaction ends (where the database supports row
+    locks), so snapshots of a project are numbered one at a time.
+    """
+    query = (
+        select(db_models.Project)
+        .where(db_models.Project.name == name)
+        .with_for_update()
+    )
+    project = db.scalar(query)
+    if project is None:
+        project = db_models.Project(name=name)
+        db.add(project)
+        try:
+            db.flush()
+        except IntegrityError:
+            # Created concurrently by another analysis of the same repository
+            db.rollback()
+            project = db.scalar(query)
+    return project
 
 
 def create_repository(db: Session, name: str) -> db_models.Repository:
-    db_repo = db_models.Repository(name=name)
-    db.add(db_repo)
+    """
+    Creates a repository row as the next snapshot of the project of that name.
+    """
+    for attempt in range(CREATE_REPOSITORY_ATTEMPTS):
+        project = get_or_create_project(db, name)
+        # Numbered in the INSERT itself; a snapshot saved concurrently without
+        # row locks (SQLite) can still take the same sequence, in which case
+        # the unique index rejects this one and it is numbered again
+        next_sequence = (
+            select(func.coalesce(func.max(db_models.Repository.sequence), 0) + 1)
+            .where(db_models.Repository.project_id == project.id)
+            .scalar_subquery()
+        )
+        db_repo = db_models.Repository(
+            name=name, project_id=project.id, sequence=next_sequence
+        )
+        db.add(db_repo)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            if attempt == CREATE_REPOSITORY_ATTEMPTS - 1:
+                raise
+            continue
+        db.refresh(db_repo)
+        return db_repo
+
+
+def _insert_files(db: Session, repo_id: int, files: Sequence[FileRecord]) -> List[int]:
+    """
+    Inserts the file rows in batches and returns their ids in input order.
+    """
+    file_ids: List[int] = []
+    for start in range(0, len(files), BULK_INSERT_BATCH_SIZE):
+        rows = [
+            {
+                "repository_id": repo_id,
+                "file_path": file_analysis.file_path,
+                "loc": file_analysis.loc,
+                "content_hash": file_analysis.content_hash,
+            }
+            for file_analysis in files[start : start + BULK_INSERT_BATCH_SIZE]
+        ]
+        result = db.execute(
+            insert(db_models.File).returning(
+                db_models.File.id, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+        file_ids.extend(result.scalars().all())
+    return file_ids
+
+
+def _symbol_rows(
+    file_id: int, symbols: Optional[SymbolsRecord]
+) -> List[Dict[str, Any]]:
+    if symbols is None:
+        return []
+    rows = [
+        {
+            "file_id": file_id,
+            "kind": "definition",
+            "name": definition.name,
+            "line_number": definition.line_number,
+        }
+        for definition in symbols.definitions
+    ]
+    for kind, names in (("reference", symbols.references), ("import", symbols.imports)):
+        rows.extend(
+            {"file_id": file_id, "kind": kind, "name": name, "line_number": None}
+            for name in names
+        )
+    return rows
+
+
+def _insert_rows(db: Session, model: Any, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        db.execute(insert(model), rows[start : start + BULK_INSERT_BATCH_SIZE])
+
+
+def save_analysis_result(db: Session, repo_id: int, files: Sequence[FileRecord]):
+    """
+    Persists all files, functions, issues and symbols of an analysis in one
+    transaction using batched multi-row inserts, and refreshes the repository
+    summary.
+    """
+    try:
+        file_ids = _insert_files(db, repo_id, files)
+
+        issue_rows: List[Dict[str, Any]] = []
+        function_rows: List[Dict[str, Any]] = []
+        symbol_rows: List[Dict[str, Any]] = []
+        for file_id, file_analysis in zip(file_ids, files):
+            symbol_rows.extend(_symbol_rows(file_id, file_analysis.symbols))
+            for issue in file_analysis.issues:
+                issue_rows.append(
+                    {
+                        "file_id": file_id,
+                        "line_number": issue.line_number,
+                        "end_line_number": issue.end_line_number,
+                        "code": issue.code,
+                        "message": issue.message,
+                    }
+                )
+            for func_metrics in file_analysis.functions:
+                function_rows.append(
+                    {
+                        "file_id": file_id,
+                        "name": func_metrics.name,
+                        "loc": func_metrics.loc,
+                        "cyclomatic_complexity": func_metrics.cyclomatic_complexity,
+                        "nesting_depth": func_metrics.nesting_depth,
+                        "num_arguments": func_metrics.num_arguments,
+                    }
+                )
+
+        _insert_rows(db, db_models.Issue, issue_rows)
+        _insert_rows(db, db_models.Function, function_rows)
+        _insert_rows(db, db_models.Symbol, symbol_rows)
+        refresh_repository_summary(db, repo_id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def save_analysis_timings(db: Session, repo_id: int, timings: Dict[str, Any]) -> None:
+    db.execute(
+        update(db_models.Repository)
+        .where(db_models.Repository.id == repo_id)
+        .values(analysis_timings=timings)
+    )
     db.commit()
-    db.refresh(db_repo)
-    return db_repo
 
 
-def save_analysis_result(
-    db: Session, repo_id: int, analysis_result: analysis_models.AnalysisResult
-):
-    for file_analysis in analysis_result.files:
-        db_file = db_models.File(
-            repository_id=repo_id,
-            file_path=file_analysis.file_path,
-            loc=file_analysis.loc,
+def get_repository(db: Session, repo_id: int) -> Optional[db_models.Repository]:
+    return (
+        db.query(db_models.Repository)
+        .filter(db_models.Repository.id == repo_id)
+        .first()
+    )
+
+
+def copy_files_forward(
+    db: Session,
+    source_repo_id: int,
+    target_repo_id: int,
+    exclude_paths: Collection[str],
+) -> None:
+    """
+    Copies the files of one repository, with their functions and issues, into
+    another, skipping exclude_paths. Rows are copied with INSERT ... SELECT so
+    nothing is loaded into Python. Must run before the target has any files of
+    its own; the caller commits.
+    """
+    old_file = aliased(db_models.File)
+    new_file = aliased(db_models.File)
+    exclude = list(exclude_paths)
+
+    file_filter = db_models.File.repository_id == source_repo_id
+    if exclude:
+        file_filter = and_(file_filter, db_models.File.file_path.not_in(exclude))
+    db.execute(
+        insert(db_models.File).from_select(
+            ["repository_id", "file_path", "loc", "content_hash"],
+            select(
+                literal(target_repo_id),
+                db_models.File.file_path,
+                db_models.File.loc,
+                db_models.File.content_hash,
+            ).where(file_filter),
         )
-        db.add(db_file)
+    )
+
+    # Copied files are matched to their originals by path
+    file_pairs = (
+        select(old_file.id.label("old_id"), new_file.id.label("new_id"))
+        .join(new_file, new_file.file_path == old_file.file_path)
+        .where(
+            old_file.repository_id == source_repo_id,
+            new_file.repository_id == target_repo_id,
+        )
+        .subquery()
+    )
+    function_columns = [
+        "name",
+        "loc",
+        "cyclomatic_complexity",
+        "nesting_depth",
+        "num_arguments",
+    ]
+    db.execute(
+        insert(db_models.Function).from_select(
+            ["file_id"] + function_columns,
+            select(
+                file_pairs.c.new_id,
+                *(getattr(db_models.Function, column) for column in function_columns),
+            ).join(file_pairs, db_models.Function.file_id == file_pairs.c.old_id),
+        )
+    )
+    issue_columns = ["line_number", "end_line_number", "code", "message"]
+    db.execute(
+        insert(db_models.Issue).from_select(
+            ["file_id"] + issue_columns,
+            select(
+                file_pairs.c.new_id,
+                *(getattr(db_models.Issue, column) for column in issue_columns),
+            ).join(file_pairs, db_models.Issue.file_id == file_pairs.c.old_id),
+        )
+    )
+    symbol_columns = ["kind", "name", "line_number"]
+    db.execute(
+        insert(db_models.Symbol).from_select(
+            ["file_id"] + symbol_columns,
+            select(
+                file_pairs.c.new_id,
+                *(getattr(db_models.Symbol, column) for column in symbol_columns),
+            ).join(file_pairs, db_models.Symbol.file_id == file_pairs.c.old_id),
+        )
+    )
+
+
+def load_symbol_index(db: Session, repo_id: int) -> SymbolIndex:
+    """
+    Builds the symbol index of a stored repository, keyed by file id.
+    """
+    index = SymbolIndex()
+    rows = db.execute(
+        select(
+            db_models.Symbol.file_id,
+            db_models.Symbol.kind,
+            db_models.Symbol.name,
+            db_models.Symbol.line_number,
+        )
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .order_by(db_models.Symbol.id)
+    )
+    symbols_by_file: Dict[int, SymbolsRecord] = {}
+    for file_id, kind, name, line_number in rows:
+        symbols = symbols_by_file.setdefault(file_id, SymbolsRecord())
+        if kind == "definition":
+            symbols.definitions.append(DefinitionRecord(name, line_number))
+        elif kind == "reference":
+            symbols.references.append(name)
+        else:
+            symbols.imports.append(name)
+    for file_id, symbols in symbols_by_file.items():
+        index.add_file(file_id, symbols)
+    return index
+
+
+def refresh_dead_code(db: Session, repo_id: int) -> None:
+    """
+    Recomputes the dead code issues of a stored repository from its symbols,
+    replacing the existing ones, and refreshes the repository summary.
+    """
+    index = load_symbol_index(db, repo_id)
+    repo_files = select(db_models.File.id).where(
+        db_models.File.repository_id == repo_id
+    )
+    db.execute(
+        delete(db_models.Issue).where(
+            db_models.Issue.file_id.in_(repo_files),
+            db_models.Issue.message == DEAD_CODE_MESSAGE,
+        )
+    )
+    _insert_rows(
+        db,
+        db_models.Issue,
+        [
+            {
+                "file_id": file_id,
+                "line_number": definition.line_number,
+                "end_line_number": None,
+                "code": definition.name,
+                "message": DEAD_CODE_MESSAGE,
+            }
+            for file_id, definition in index.dead_definitions()
+        ],
+    )
+    refresh_repository_summary(db, repo_id)
+    db.commit()
+
+
+def refresh_repository_summary(
+    db: Session, repo_id: int
+) -> db_models.RepositorySummary:
+    """
+    Recomputes the summary row of a repository with SQL aggregates. The
+    caller commits.
+    """
+    total_files, total_loc = db.execute(
+        select(func.count(), func.coalesce(func.sum(db_models.File.loc), 0)).where(
+            db_models.File.repository_id == repo_id
+        )
+    ).one()
+    total_functions, mean_complexity, max_complexity = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.avg(db_models.Function.cyclomatic_complexity), 0.0),
+            func.coalesce(func.max(db_models.Function.cyclomatic_complexity), 0),
+        )
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+    ).one()
+    issue_counts = count_issues_by_message(db, repo_id)
+
+    db.execute(
+        delete(db_models.RepositorySummary).where(
+            db_models.RepositorySummary.repository_id == repo_id
+        )
+    )
+    summary = db_models.RepositorySummary(
+        repository_id=repo_id,
+        total_files=total_files,
+        total_loc=total_loc,
+        total_functions=total_functions,
+        total_issues=sum(issue_counts.values()),
+        mean_complexity=float(mean_complexity),
+        max_complexity=max_complexity,
+        issue_counts=issue_counts,
+    )
+    db.add(summary)
+    db.flush()
+    return summary
+
+
+def get_repository_summary(
+    db: Session, repo_id: int
+) -> Optional[db_models.RepositorySummary]:
+    """
+    Returns the summary of a repository, computing it for repositories saved
+    before summaries existed, or None if the repository does not exist.
+    """
+    summary = db.get(db_models.RepositorySummary, repo_id)
+    if summary is None:
+        if db.get(db_models.Repository, repo_id) is None:
+            return None
+        summary = refresh_repository_summary(db, repo_id)
         db.commit()
-        db.refresh(db_file)
-
-        for issue in file_analysis.issues:
-            db_issue = db_models.Issue(
-                file_id=db_file.id,
-                line_number=issue.line_number,
-                code=issue.code,
-                message=issue.message,
+        # Reload now so callers can read it after the session work is done
+        db.refresh(summary)
+    return summary
+
+
+def get_files_page(
+    db: Session,
+    repo_id: int,
+    cursor: Optional[int],
+    limit: int,
+    path_prefix: Optional[str] = None,
+    min_complexity: Optional[int] = None,
+    max_complexity: Optional[int] = None,
+) -> Tuple[List[db_models.File], Optional[int]]:
+    """
+    Returns a page of files ordered by id, starting after cursor, with their
+    functions and issues eagerly loaded, and the cursor of the next page.
+    The complexity range keeps files having at least one function in range.
+    """
+    query = (
+        select(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .options(
+            selectinload(db_models.File.functions),
+            selectinload(db_models.File.issues),
+        )
+        .order_by(db_models.File.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(db_models.File.id > cursor)
+    if path_prefix:
+        query = query.where(db_models.File.file_path.startswith(path_prefix))
+    if min_complexity is not None or max_complexity is not None:
+        in_range = select(db_models.Function.id).where(
+            db_models.Function.file_id == db_models.File.id
+        )
+        if min_complexity is not None:
+            in_range = in_range.where(
+                db_models.Function.cyclomatic_complexity >= min_complexity
+            )
+        if max_complexity is not None:
+            in_range = in_range.where(
+                db_models.Function.cyclomatic_complexity <= max_complexity
+            )
+        query = query.where(in_range.exists())
+
+    files = list(db.scalars(query))
+    next_cursor = files[limit - 1].id if len(files) > limit else None
+    return files[:limit], next_cursor
+
+
+def get_issues_page(
+    db: Session,
+    repo_id: int,
+    cursor: Optional[int],
+    limit: int,
+    message: Optional[str] = None,
+    path_prefix: Optional[str] = None,
+) -> Tuple[List[Tuple[db_models.Issue, str]], Optional[int]]:
+    """
+    Returns a page of (issue, file path) pairs ordered by issue id, starting
+    after cursor, and the cursor of the next page.
+    """
+    query = (
+        select(db_models.Issue, db_models.File.file_path)
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .order_by(db_models.Issue.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(db_models.Issue.id > cursor)
+    if message:
+        query = query.where(db_models.Issue.message == message)
+    if path_prefix:
+        query = query.where(db_models.File.file_path.startswith(path_prefix))
+
+    rows = [tuple(row) for row in db.execute(query)]
+    next_cursor = rows[limit - 1][0].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def count_issues_by_message(db: Session, repo_id: int) -> Dict[str, int]:
+    rows = db.execute(
+        select(db_models.Issue.message, func.count())
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .group_by(db_models.Issue.message)
+        .order_by(func.count().desc())
+    )
+    return {message: count for message, count in rows}
+
+
+def complexity_histogram(
+    db: Session, repo_id: int, bucket_size: int
+) -> List[Tuple[int, int]]:
+    """
+    Returns (bucket start, function count) pairs for the cyclomatic complexity
+    of the repository's functions, bucketed in SQL.
+    """
+    bucket = (db_models.Function.cyclomatic_complexity // bucket_size) * bucket_size
+    rows = db.execute(
+        select(bucket.label("bucket"), func.count())
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .group_by("bucket")
+        .order_by("bucket")
+    )
+    return [(int(start), count) for start, count in rows]
+
+
+def get_file_metric_rows(db: Session, repo_id: int) -> List[Tuple[int, str, int]]:
+    """
+    Returns (file id, file path, LOC) for every file of a repository.
+    """
+    rows = db.execute(
+        select(db_models.File.id, db_models.File.file_path, db_models.File.loc)
+        .where(db_models.File.repository_id == repo_id)
+        .order_by(db_models.File.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def get_function_metric_rows(
+    db: Session, repo_id: int
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Returns (function id, file id, LOC, cyclomatic complexity) for every
+    function of a repository, as plain tuples fetched through Core.
+    """
+    rows = db.connection().execute(
+        select(
+            db_models.Function.id,
+            db_models.Function.file_id,
+            db_models.Function.loc,
+            db_models.Function.cyclomatic_complexity,
+        )
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def count_issues_by_file(db: Session, repo_id: int) -> List[Tuple[int, int]]:
+    rows = db.execute(
+        select(db_models.Issue.file_id, func.count())
+        .join(db_models.File)
+        .where(db_models.File.repository_id == repo_id)
+        .group_by(db_models.Issue.file_id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def get_function_names(db: Session, function_ids: Collection[int]) -> Dict[int, str]:
+    rows = db.execute(
+        select(db_models.Function.id, db_models.Function.name).where(
+            db_models.Function.id.in_(list(function_ids))
+        )
+    )
+    return {function_id: name for function_id, name in rows}
+
+
+def _issues_missing_from(repo_id: int, other_repo_id: int):
+    """
+    Builds the query of the issues of repo_id that other_repo_id does not
+    have, with their file paths. Issues are matched by file path, message and
+    code rather than by line, so code moving within a file does not count as
+    a change. Files whose content hash is the same in both repositories are
+    skipped without comparing their issues, except for dead code issues,
+    which depend on the other files of the repository.
+    """
+    other_file = aliased(db_models.File)
+    other_issue = aliased(db_models.Issue)
+    unchanged_file = exists().where(
+        other_file.repository_id == other_repo_id,
+        other_file.file_path == db_models.File.file_path,
+        other_file.content_hash == db_models.File.content_hash,
+    )
+    # The file is looked up first (paths are unique within a repository) so
+    # that its issues are searched through the (file_id, message) index
+    other_file_id = (
+        select(other_file.id)
+        .where(
+            other_file.repository_id == other_repo_id,
+            other_file.file_path == db_models.File.file_path,
+        )
+        .correlate_except(other_file)
+        .scalar_subquery()
+    )
+    matching_issue = exists().where(
+        other_issue.file_id == other_file_id,
+        other_issue.message == db_models.Issue.message,
+        other_issue.code == db_models.Issue.code,
+    )
+    return (
+        select(db_models.Issue, db_models.File.file_path)
+        .join(db_models.File)
+        .where(
+            db_models.File.repository_id == repo_id,
+            or_(db_models.Issue.message == DEAD_CODE_MESSAGE, ~unchanged_file),
+            ~matching_issue,
+        )
+    )
+
+
+def compare_snapshots(
+    db: Session, base_repo_id: int, repo_id: int, limit: int
+) -> Dict[str, Any]:
+    """
+    Compares the issues of a repository with those of a base repository,
+    usually an earlier snapshot of the same project. Returns the number of
+    files whose content is unchanged, and the count and first limit rows
+    (issue, file path) of the issues introduced and fixed since the base.
+    """
+    base_file = aliased(db_models.File)
+    unchanged_files = db.scalar(
+        select(func.count())
+        .select_from(db_models.File)
+        .join(
+            base_file,
+            and_(
+                base_file.repository_id == base_repo_id,
+                base_file.file_path == db_models.File.file_path,
+                base_file.content_hash == db_models.File.content_hash,
+            ),
+        )
+        .where(db_models.File.repository_id == repo_id)
+    )
+    comparison: Dict[str, Any] = {"unchanged_files": unchanged_files}
+    for name, query in (
+        ("introduced", _issues_missing_from(repo_id, base_repo_id)),
+        ("fixed", _issues_missing_from(base_repo_id, repo_id)),
+    ):
+        comparison[f"{name}_count"] = db.scalar(
+            select(func.count()).select_from(query.subquery())
+        )
+        comparison[name] = [
+            tuple(row)
+            for row in db.execute(
+                query.order_by(db_models.File.file_path, db_models.Issue.id).limit(
+                    limit
+                )
             )
-            db.add(db_issue)
-
-        for func_metrics in file_analysis.functions:
-            db_func = db_models.Function(
-                file_id=db_file.id,
-                name=func_metrics.name,
-                loc=func_metrics.loc,
-                cyclomatic_complexity=func_metrics.cyclomatic_complexity,
-                nesting_depth=func_metrics.nesting_depth,
-                num_arguments=func_metrics.num_arguments,
+        ]
+    return comparison
+
+
+def get_metric_trend(
+    db: Session, repo_id: int, limit: int
+) -> List[Tuple[db_models.Repository, db_models.RepositorySummary]]:
+    """
+    Returns the last limit snapshots of the project of a repository, up to and
+    including it, oldest first, with their summaries.
+    """
+    current = db.get(db_models.Repository, repo_id)
+    if current is None:
+        return []
+    query = select(db_models.Repository.id).order_by(
+        db_models.Repository.sequence.desc()
+    )
+    if current.project_id is None:
+        query = query.where(db_models.Repository.id == repo_id)
+    else:
+        query = query.where(
+            db_models.Repository.project_id == current.project_id,
+            db_models.Repository.sequence <= current.sequence,
+        )
+    snapshot_ids = list(db.scalars(query.limit(limit)))
+
+    # Summaries of repositories saved before summaries existed are computed
+    # first, so that nothing is expired once the rows are returned
+    summarized = set(
+        db.scalars(
+            select(db_models.RepositorySummary.repository_id).where(
+                db_models.RepositorySummary.repository_id.in_(snapshot_ids)
             )
-            db.add(db_func)
+        )
+    )
+    missing = [
+        snapshot_id for snapshot_id in snapshot_ids if snapshot_id not in summarized
+    ]
+    for snapshot_id in missing:
+        refresh_repository_summary(db, snapshot_id)
+    if missing:
+        db.commit()
+
+    rows = db.execute(
+        select(db_models.Repository, db_models.RepositorySummary)
+        .join(
+            db_models.RepositorySummary,
+            db_models.RepositorySummary.repository_id == db_models.Repository.id,
+        )
+        .where(db_models.Repository.id.in_(snapshot_ids))
+        .order_by(db_models.Repository.sequence, db_models.Repository.id)
+    )
+    return [tuple(row) for row in rows]
+
+
+def export_columns(kind: str) -> List[str]:
+    _, columns = EXPORT_COLUMNS[kind]
+    return [*columns, "file_path"]
+
+
+def iter_export_rows(
+    db: Session, repo_id: int, kind: str, batch_size: int
+) -> Iterator[Sequence[Tuple[Any, ...]]]:
+    """
+    Yields the rows of one of the EXPORT_COLUMNS tables for a repository in
+    batches of batch_size, with the columns given by export_columns. Rows are
+    fetched through a server-side cursor, so memory use does not grow with
+    the size of the repository. They are ordered by file path, then id: this
+    order follows the (repository_id, file_path) index, so only the rows of
+    one file at a time are sorted, not the whole export.
+    """
+    model, columns = EXPORT_COLUMNS[kind]
+    query = select(
+        *(getattr(model, column) for column in columns), db_models.File.file_path
+    )
+    if model is not db_models.File:
+        query = query.join(db_models.File)
+    query = (
+        query.where(db_models.File.repository_id == repo_id)
+        .order_by(db_models.File.file_path, model.id)
+        .execution_options(yield_per=batch_size)
+    )
+    # Executed through Core, skipping the ORM result processing of Session.execute
+    for partition in db.connection().execute(query).partitions():
+        yield [tuple(row) for row in partition]
+
+
+def create_job(
+    db: Session, repository_name: str, upload_path: str
+) -> db_models.AnalysisJob:
+    db_job = db_models.AnalysisJob(
+        repository_name=repository_name, upload_path=upload_path, state="queued"
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+
+def get_job(db: Session, job_id: int) -> Optional[db_models.AnalysisJob]:
+    return (
+        db.query(db_models.AnalysisJob)
+        .filter(db_models.AnalysisJob.id == job_id)
+        .first()
+    )
+
+
+def get_unfinished_jobs(db: Session) -> List[db_models.AnalysisJob]:
+    return (
+        db.query(db_models.AnalysisJob)
+        .filter(db_models.AnalysisJob.state.in_(("queued", "running")))
+        .order_by(db_models.AnalysisJob.id)
+        .all()
+    )
+
+
+def update_job(db: Session, job_id: int, **values: Any) -> None:
+    db.execute(
+        update(db_models.AnalysisJob)
+        .where(db_models.AnalysisJob.id == job_id)
+        .values(**values)
+    )
+    db.commit()
+
+
+def update_job_progress(db: Session, job_id: int, files_done: int) -> None:
+    """
+    Records progress of a running job. Progress only moves forward, so updates
+    that arrive out of order are ignored.
+    """
+    db.execute(
+        update(db_models.AnalysisJob)
+        .where(
+            db_models.AnalysisJob.id == job_id,
+            db_models.AnalysisJob.state == "running",
+            db_models.AnalysisJob.files_done < files_done,
+        )
+        .values(files_done=files_done)
+    )
     db.commit()
@@ -0,0 +1,167 @@
+import os
+import random
+from typing import Callable, Dict, List, Set, Tuple
+
+# Messages of the issues the generator plants; they mirror the analyzer rules
+COMPLEXITY = "High cyclomatic complexity"
+GOD_FUNCTION = "God function (too long)"
+DEEP_NESTING = "Deeply nested function"
+LONG_PARAMETERS = "Long parameter list"
+DEAD_CODE = "Dead code (unused function)"
+SELECT_STAR = "Avoid using 'SELECT *'"
+MISSING_WHERE = "Missing WHERE clause in UPDATE/DELETE statement"
+NESTED_SUBQUERY = "Potential nested subquery"
+HARDCODED_WHERE = "Hardcoded value in WHERE clause"
+
+# Files per generated package directory
+FILES_PER_PACKAGE = 50
+
+# A function template returns its source lines, given the function name
+FunctionTemplate = Callable[[random.Random, str], List[str]]
+
+
+def _clean_function(rng: random.Random, name: str) -> List[str]:
+    return [
+        f"def {name}(items, limit):",
+        "    total = 0",
+        "    for item in items:",
+        "        if item > limit:",
+        "            total += item",
+        "    return total",
+    ]
+
+
+def _complex_function(rng: random.Random, name: str) -> List[str]:
+    lines = [f"def {name}(value, offset):", "    total = offset"]
+    for i in range(rng.randint(11, 15)):
+        lines += [f"    if value == {i}:", f"        total += {i}"]
+    return lines + ["    return total"]
+
+
+def _long_function(rng: random.Random, name: str) -> List[str]:
+    lines = [f"def {name}(value, offset):", "    total = offset"]
+    lines += [f"    total = total + value * {i}" for i in range(rng.randint(55, 80))]
+    return lines + ["    return total"]
+
+
+def _nested_function(rng: random.Random, name: str) -> List[str]:
+    lines = [f"def {name}(value, offset):"]
+    depth = rng.randint(5, 7)
+    for level in range(depth):
+        lines.append(f"{'    ' * (level + 1)}if value > {level}:")
+    lines.append(f"{'    ' * (depth + 1)}return value + offset")
+    return lines + ["    return offset"]
+
+
+def _parameters_function(rng: random.Random, name: str) -> List[str]:
+    params = [f"arg{i}" for i in range(rng.randint(6, 9))]
+    return [f"def {name}({', '.join(params)}):", f"    return {' + '.join(params)}"]
+
+
+# Planted issue kinds, with the message each one should produce
+PYTHON_ISSUES: List[Tuple[str, FunctionTemplate]] = [
+    (COMPLEXITY, _complex_function),
+    (GOD_FUNCTION, _long_function),
+    (DEEP_NESTING, _nested_function),
+    (LONG_PARAMETERS, _parameters_function),
+]
+
+CLEAN_SQL = [
+    "SELECT id, name FROM {table} WHERE id = {n};",
+    "INSERT INTO {table} (id, name) VALUES ({n}, 'item {n}');",
+    "UPDATE {table} SET visits = visits + 1 WHERE id = {n};",
+    "DELETE FROM {table} WHERE id = {n};",
+]
+
+SQL_ISSUES = [
+    (SELECT_STAR, "SELECT * FROM {table} WHERE id = {n};"),
+    (MISSING_WHERE, "DELETE FROM {table};"),
+    (
+        NESTED_SUBQUERY,
+        "SELECT id FROM {table} WHERE owner_id IN (SELECT id FROM owners WHERE active = {n});",
+    ),
+    (HARDCODED_WHERE, "SELECT id FROM {table} WHERE name = 'user {n}';"),
+]
+
+
+def generate_python_file(
+    rng: random.Random, file_index: int, issue_rate: float
+) -> Tuple[str, Set[str]]:
+    """
+    Returns the source of a Python module and the messages planted in it.
+    Every function but the dead ones is called from main(), which is itself
+    called at module level.
+    """
+    planted: Set[str] = set()
+    lines: List[str] = []
+    called: List[Tuple[str, int]] = []
+    for n in range(rng.randint(3, 8)):
+        name = f"func_{file_index}_{n}"
+        template: FunctionTemplate = _clean_function
+        if rng.random() < issue_rate:
+            if rng.random() < 0.2:
+                planted.add(DEAD_CODE)
+                lines += _clean_function(rng, name) + ["", ""]
+                continue
+            message, template = rng.choice(PYTHON_ISSUES)
+            planted.add(message)
+        function_lines = template(rng, name)
+        lines += function_lines + ["", ""]
+        # Arguments of the def line, e.g. "def f(a, b):" takes two
+        signature = function_lines[0]
+        called.append((name, signature.count(",") + 1))
+
+    lines.append("def main():")
+    lines += [f"    {name}({', '.join(['1'] * arity)})" for name, arity in called]
+    lines += ["    return None", "", "", 'if __name__ == "__main__":', "    main()", ""]
+    return "\n".join(lines), planted
+
+
+def generate_sql_file(
+    rng: random.Random, file_index: int, issue_rate: float
+) -> Tuple[str, Set[str]]:
+    """
+    Returns the content of a SQL file and the messages planted in it.
+    """
+    planted: Set[str] = set()
+    statements = []
+    for n in range(rng.randint(10, 40)):
+        table = f"table_{file_index}_{n % 5}"
+        template = rng.choice(CLEAN_SQL)
+        if rng.random() < issue_rate / 4:
+            message, template = rng.choice(SQL_ISSUES)
+            planted.add(message)
+        statements.append(template.format(table=table, n=n))
+    return "\n".join(statements) + "\n", planted
+
+
+def generate_repository(
+    root_dir: str,
+    files: int,
+    seed: int = 0,
+    sql_ratio: float = 0.1,
+    issue_rate: float = 0.2,
+) -> Dict[str, Set[str]]:
+    """
+    Writes a synthetic repository of the given number of Python and SQL files
+    below root_dir, with issues planted in about issue_rate of the functions
+    and a quarter of that rate of SQL statements. The same seed always
+    produces the same repository. Returns the ground truth: the messages
+    expected for every file, keyed by path, in the format used by
+    src.evaluation.metrics.
+    """
+    rng = random.Random(seed)
+    ground_truth: Dict[str, Set[str]] = {}
+    for file_index in range(files):
+        package = os.path.join(root_dir, f"pkg_{file_index // FILES_PER_PACKAGE}")
+        os.makedirs(package, exist_ok=True)
+        if rng.random() < sql_ratio:
+            path = os.path.join(package, f"queries_{file_index}.sql")
+            content, planted = generate_sql_file(rng, file_index, issue_rate)
+        else:
+            path = os.path.join(package, f"module_{file_index}.py")
+            content, planted = generate_python_file(rng, file_index, issue_rate)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        ground_truth[path] = planted
+    return ground_truth
@@ -1,4 +1,4 @@
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 
 # Ground truth for the synthetic dataset
 GROUND_TRUTH = {
@@ -21,17 +21,22 @@ GROUND_TRUTH = {
 }
 
 
-def calculate_metrics(analysis_results: Dict[str, Set[str]]) -> Dict[str, float]:
+def calculate_metrics(
+    analysis_results: Dict[str, Set[str]],
+    ground_truth: Optional[Dict[str, Set[str]]] = None,
+) -> Dict[str, float]:
+    if ground_truth is None:
+        ground_truth = GROUND_TRUTH
     true_positives = 0
     false_positives = 0
     false_negatives = 0
 
     all_possible_issues: Set[str] = set()
-    for issues in GROUND_TRUTH.values():
+    for issues in ground_truth.values():
         all_possible_issues.update(issues)
 
     for file_path, detected_issues in analysis_results.items():
-        ground_truth_issues = GROUND_TRUTH.get(file_path, set())
+        ground_truth_issues = ground_truth.get(file_path, set())
 
         tp = len(detected_issues.intersection(ground_truth_issues))
         fp = len(detected_issues.difference(ground_truth_issues))
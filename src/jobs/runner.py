@@ -0,0 +1,304 @@
+import asyncio
+import cProfile
+import logging
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Awaitable, BinaryIO, Callable, List, Optional, Set, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from src.analysis.engine import (
+    SkippedFile,
+    SourceFile,
+    analyze_sources,
+    analyze_sources_async,
+)
+from src.analysis.ingest import read_zip_sources
+from src.analysis.records import FileRecord
+from src.analysis.symbols import apply_dead_code_issues
+from src.core.config import settings
+from src.core.instrumentation import StageTimings, finish_analysis, start_profiler
+from src.data import repository as repo
+from src.data.database import SessionRunner, session_scope
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _call(profiler: Optional[cProfile.Profile], func: Callable[..., T], *args) -> T:
+    return profiler.runcall(func, *args) if profiler is not None else func(*args)
+
+
+async def _analyze(
+    sources: List[SourceFile],
+    progress: Optional[Callable[[int], None]],
+    timings: StageTimings,
+    profiler: Optional[cProfile.Profile],
+) -> List[FileRecord]:
+    """
+    Analyzes the sources in the process pool or, for a profiled analysis, in
+    a worker thread under the profiler so that the profile covers the
+    analyzers. Files that cannot be parsed are skipped with a warning, as by
+    the CLI.
+    """
+    skipped: List[SkippedFile] = []
+    if profiler is None:
+        analyses = await analyze_sources_async(sources, progress, timings, skipped)
+    else:
+        analyses = await asyncio.to_thread(
+            profiler.runcall, analyze_sources, sources, timings, False, skipped
+        )
+        if progress:
+            progress(len(sources))
+    for file_path, error in skipped:
+        logger.warning("Skipping %s: %s", file_path, error)
+    return analyses
+
+
+def _elapsed(timings: StageTimings, started: float) -> float:
+    # Extraction happens before the analysis starts
+    return timings.seconds("extract") + time.perf_counter() - started
+
+
+async def run_analysis(
+    db: SessionRunner,
+    repo_name: str,
+    sources: List[SourceFile],
+    progress: Optional[Callable[[int], None]] = None,
+    timings: Optional[StageTimings] = None,
+) -> int:
+    """
+    Analyzes the sources and persists the results as a new repository,
+    returning its id. The time spent in each stage, added to timings if
+    given (e.g. with the extraction of an upload), is stored with the
+    repository and recorded in the process-wide metrics.
+    """
+    timings = timings if timings is not None else StageTimings()
+    profiler = start_profiler()
+    started = time.perf_counter()
+    file_analyses = await _analyze(sources, progress, timings, profiler)
+    with timings.time("dead_code"):
+        file_analyses = _call(profiler, apply_dead_code_issues, file_analyses)
+
+    def save(session: Session) -> int:
+        db_repo = repo.create_repository(session, name=repo_name)
+        with timings.time("persist"):
+            _call(
+                profiler, repo.save_analysis_result, session, db_repo.id, file_analyses
+            )
+        repo.save_analysis_timings(
+            session,
+            db_repo.id,
+            {"wall_seconds": _elapsed(timings, started), "stages": timings.to_dict()},
+        )
+        return db_repo.id
+
+    repo_id = await db.run(save)
+    finish_analysis(
+        timings, _elapsed(timings, started), profiler, f"repository-{repo_id}"
+    )
+    return repo_id
+
+
+async def run_incremental_analysis(
+    db: SessionRunner,
+    base_repo_id: int,
+    sources: List[SourceFile],
+    deleted_paths: List[str],
+    timings: Optional[StageTimings] = None,
+) -> int:
+    """
+    Creates a new repository from a previous one and a delta. Only the changed
+    sources are analyzed; every other file is copied forward from the base
+    repository together with its functions, issues and symbols, after which
+    dead code is recomputed for the whole repository. Timings are handled as
+    in run_analysis.
+    """
+    base_repo = await db.run(repo.get_repository, base_repo_id)
+    if base_repo is None:
+        raise LookupError(f"Repository {base_repo_id} not found")
+
+    timings = timings if timings is not None else StageTimings()
+    profiler = start_profiler()
+    started = time.perf_counter()
+    file_analyses = await _analyze(sources, None, timings, profiler)
+    touched = {file_path for file_path, _ in sources} | set(deleted_paths)
+
+    def save(session: Session) -> int:
+        db_repo = repo.create_repository(session, name=base_repo.name)
+        with timings.time("copy_forward"):
+            _call(
+                profiler,
+                repo.copy_files_forward,
+                session,
+                base_repo_id,
+                db_repo.id,
+                touched,
+            )
+        with timings.time("persist"):
+            _call(
+                profiler, repo.save_analysis_result, session, db_repo.id, file_analyses
+            )
+        with timings.time("dead_code"):
+            _call(profiler, repo.refresh_dead_code, session, db_repo.id)
+        repo.save_analysis_timings(
+            session,
+            db_repo.id,
+            {"wall_seconds": _elapsed(timings, started), "stages": timings.to_dict()},
+        )
+        return db_repo.id
+
+    repo_id = await db.run(save)
+    finish_analysis(
+        timings, _elapsed(timings, started), profiler, f"repository-{repo_id}"
+    )
+    return repo_id
+
+
+async def _with_session(func, *args, **kwargs):
+    async with session_scope() as db:
+        return await db.run(func, *args, **kwargs)
+
+
+class JobManager:
+    """
+    Runs queued analysis jobs in the background. Job state lives in the
+    database and uploads are kept on disk until the job finishes, so jobs that
+    were queued or running when the server stopped are resumed on startup.
+    At most MAX_CONCURRENT_JOBS analyses run at the same time, counting those
+    the API runs directly through run.
+    """
+
+    def __init__(self, max_concurrent_jobs: int):
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, repo_name: str, upload: BinaryIO) -> int:
+        """
+        Stores the upload, records a queued job and schedules it. The upload
+        is complete on disk before the job is recorded, so a job never refers
+        to a missing or partial upload.
+        """
+        os.makedirs(settings.JOBS_UPLOAD_DIR, exist_ok=True)
+        upload_path = os.path.join(
+            settings.JOBS_UPLOAD_DIR, f"upload_{uuid.uuid4().hex}.zip"
+        )
+
+        def store() -> None:
+            partial_path = upload_path + ".part"
+            try:
+                with open(partial_path, "wb") as f:
+                    shutil.copyfileobj(upload, f)
+                os.replace(partial_path, upload_path)
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+
+        await run_in_threadpool(store)
+        try:
+            db_job = await _with_session(repo.create_job, repo_name, upload_path)
+        except BaseException:
+            await run_in_threadpool(os.remove, upload_path)
+            raise
+        self._schedule(db_job.id)
+        return db_job.id
+
+    async def run(
+        self, analysis: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        Runs an analysis outside the job queue, e.g. for a synchronous API
+        request, once fewer than MAX_CONCURRENT_JOBS analyses are running.
+        """
+        async with self._semaphore:
+            return await analysis(*args, **kwargs)
+
+    async def resume(self) -> None:
+        """
+        Reschedules jobs left unfinished by a previous process.
+        """
+        jobs = await _with_session(repo.get_unfinished_jobs)
+        for db_job in jobs:
+            self._schedule(db_job.id)
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _schedule(self, job_id: int) -> None:
+        self._spawn(self._run(job_id))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job_id: int) -> None:
+        async with self._semaphore:
+            db_job = await _with_session(repo.get_job, job_id)
+            if db_job is None:
+                return
+            try:
+                await self._process(
+                    db_job.id, db_job.repository_name, db_job.upload_path
+                )
+            except asyncio.CancelledError:
+                # Left in its current state so it is resumed on next startup
+                raise
+            except Exception as e:
+                logger.exception("Analysis job %s failed", job_id)
+                await _with_session(
+                    repo.update_job, job_id, state="failed", error=str(e)
+                )
+            if os.path.exists(db_job.upload_path):
+                await run_in_threadpool(os.remove, db_job.upload_path)
+
+    async def _process(self, job_id: int, repo_name: str, upload_path: str) -> None:
+        def read() -> List[SourceFile]:
+            with open(upload_path, "rb") as f:
+                return read_zip_sources(
+                    f,
+                    settings.UPLOAD_MAX_MEMBER_BYTES,
+                    settings.UPLOAD_MAX_TOTAL_BYTES,
+                )
+
+        timings = StageTimings()
+        with timings.time("extract"):
+            sources = await run_in_threadpool(read)
+        await _with_session(
+            repo.update_job,
+            job_id,
+            state="running",
+            files_total=len(sources),
+            files_done=0,
+        )
+
+        def progress(files_done: int) -> None:
+            self._spawn(_with_session(repo.update_job_progress, job_id, files_done))
+
+        async with session_scope() as db:
+            repository_id = await run_analysis(
+                db, repo_name, sources, progress, timings
+            )
+        await _with_session(
+            repo.update_job,
+            job_id,
+            state="completed",
+            files_done=len(sources),
+            repository_id=repository_id,
+        )
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    global _manager
+    if _manager is None:
+        _manager = JobManager(settings.MAX_CONCURRENT_JOBS)
+    return _manager
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from src.llm.cache import ResponseCache, prompt_key
+from src.llm.client import LLMClient
+from src.llm.tokens import count_tokens
+
+
+class RateLimiter:
+    """
+    Spaces out requests so no more than requests_per_minute start in any
+    minute. A limit of 0 disables rate limiting.
+    """
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        # Claiming the slot does not await, so concurrent callers cannot race
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class CompletionRunner:
+    """
+    Sends prompts to an LLM client concurrently, within a concurrency limit
+    and a rate limit, answering repeated prompts from the response cache.
+    Counts the requests sent and the tokens they used.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        cache: Optional[ResponseCache] = None,
+        model: str = "",
+        max_concurrency: int = 4,
+        requests_per_minute: int = 0,
+    ):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.max_concurrency = max(1, max_concurrency)
+        self.limiter = RateLimiter(requests_per_minute)
+        self.requests_sent = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def complete_many(self, prompts: List[str]) -> List[str]:
+        """
+        Returns the response to every prompt, in the order of the prompts.
+        """
+        cache_keys = [prompt_key(self.model, prompt) for prompt in prompts]
+        responses: Dict[str, str] = (
+            self.cache.get_many(cache_keys) if self.cache else {}
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def complete(prompt: str, cache_key: str) -> None:
+            async with semaphore:
+                await self.limiter.acquire()
+                self.requests_sent += 1
+                response = await self.client.get_completion_async(prompt)
+            self.prompt_tokens += count_tokens(prompt, self.model)
+            self.completion_tokens += count_tokens(response, self.model)
+            responses[cache_key] = response
+            if self.cache:
+                self.cache.put(cache_key, response)
+
+        pending = {
+            cache_key: prompt
+            for prompt, cache_key in zip(prompts, cache_keys)
+            if cache_key not in responses
+        }
+        await asyncio.gather(
+            *(complete(prompt, cache_key) for cache_key, prompt in pending.items())
+        )
+        return [responses[cache_key] for cache_key in cache_keys]
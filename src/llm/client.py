@@ -1,34 +1,57 @@
+import asyncio
 from abc import ABC, abstractmethod
-import openai
 from src.core.config import settings
 from typing import List
 from src.analysis.models import Issue
 from src.llm.prompts import create_issue_explanation_prompt
 
+SYSTEM_PROMPT = "You are a senior software engineer and static analysis expert."
+
 
 class LLMClient(ABC):
     @abstractmethod
     def get_completion(self, prompt: str) -> str:
         pass
 
+    async def get_completion_async(self, prompt: str) -> str:
+        """
+        Async variant of get_completion. Clients without a native async API
+        run the blocking call in a worker thread.
+        """
+        return await asyncio.to_thread(self.get_completion, prompt)
+
 
 class OpenAIClient(LLMClient):
     def __init__(self):
+        # Imported here so modules using LLMClient do not pay for the SDK
+        import openai
+
         self.client = openai.OpenAI(
             api_key=settings.OPENAI_API_KEY,
             base_url=settings.OPENAI_API_BASE,
         )
+        self.async_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_API_BASE,
+        )
+
+    def _messages(self, prompt: str) -> List[dict]:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
 
     def get_completion(self, prompt: str) -> str:
         completion = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a senior software engineer and static analysis expert.",
-                },
-                {"role": "user", "content": prompt},
-            ],
+            model=settings.OPENAI_MODEL,
+            messages=self._messages(prompt),
+        )
+        return completion.choices[0].message.content or ""
+
+    async def get_completion_async(self, prompt: str) -> str:
+        completion = await self.async_client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=self._messages(prompt),
         )
         return completion.choices[0].message.content or ""
 
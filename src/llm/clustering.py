@@ -0,0 +1,184 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.analysis.models import Issue
+from src.core.config import settings
+from src.llm.batching import CompletionRunner
+from src.llm.cache import ResponseCache, get_response_cache
+from src.llm.client import LLMClient, get_llm_client
+from src.llm.prompts import create_cluster_chunk_prompt, create_cluster_merge_prompt
+from src.llm.tokens import CHARS_PER_TOKEN, count_tokens
+
+# Code longer than this is cut in group descriptions and fingerprints
+MAX_SAMPLE_CODE_CHARS = 120
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_NUMBER = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def code_fingerprint(code: str) -> str:
+    """
+    Normalizes issue code so issues differing only in literals, numbers,
+    case or whitespace, e.g. func_1 and func_2, share a fingerprint.
+    """
+    code = _STRING_LITERAL.sub("?", code)
+    code = _NUMBER.sub("#", code)
+    code = _WHITESPACE.sub(" ", code).strip().lower()
+    return code[:MAX_SAMPLE_CODE_CHARS]
+
+
+class IssueGroup:
+    """
+    Issues sharing a message and code fingerprint, with a few samples.
+    """
+
+    __slots__ = ("message", "fingerprint", "count", "samples")
+
+    def __init__(self, message: str, fingerprint: str):
+        self.message = message
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.samples: List[Issue] = []
+
+    def describe(self) -> str:
+        samples = "; ".join(
+            f"{' '.join(issue.code.split())[:MAX_SAMPLE_CODE_CHARS]} (line {issue.line_number})"
+            for issue in self.samples
+        )
+        return f"- {self.message}, {self.count} occurrences, e.g. {samples}"
+
+
+def group_issues(issues: List[Issue], samples_per_group: int) -> List[IssueGroup]:
+    """
+    Groups issues by message and code fingerprint, keeping the first
+    samples_per_group issues of each group, largest groups first.
+    """
+    groups: Dict[Tuple[str, str], IssueGroup] = {}
+    for issue in issues:
+        fingerprint = code_fingerprint(issue.code)
+        group = groups.get((issue.message, fingerprint))
+        if group is None:
+            group = groups[(issue.message, fingerprint)] = IssueGroup(
+                issue.message, fingerprint
+            )
+        group.count += 1
+        if len(group.samples) < samples_per_group:
+            group.samples.append(issue)
+    return sorted(groups.values(), key=lambda g: (-g.count, g.message, g.fingerprint))
+
+
+def chunk_by_tokens(
+    items: List[str], overhead_tokens: int, token_budget: int, model: str = ""
+) -> List[List[str]]:
+    """
+    Packs items, in order, into chunks whose token count together with the
+    prompt overhead stays within token_budget. An item too large for a chunk
+    of its own is truncated to fit.
+    """
+    available = max(1, token_budget - overhead_tokens)
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for item in items:
+        # Items are joined by newlines, which cost about a token each
+        tokens = count_tokens(item, model) + 1
+        if tokens > available:
+            item = item[: (available - 1) * CHARS_PER_TOKEN]
+            tokens = available
+        if current and used + tokens > available:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ClusteringResult(BaseModel):
+    summary: str
+    issues: int
+    groups: int
+    groups_sent: int
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class ClusteringPipeline:
+    """
+    Summarizes the recurring themes of a repository's issues within a bounded
+    LLM cost. Issues are grouped locally, only representative samples of the
+    largest groups are sent, in chunks that fit the token budget, and the
+    partial summaries are merged map-reduce style until one remains.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        cache: Optional[ResponseCache] = None,
+        model: str = "",
+        token_budget: int = 3000,
+        samples_per_group: int = 3,
+        max_groups: int = 200,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 0,
+    ):
+        self.runner = CompletionRunner(
+            client, cache, model, max_concurrency, requests_per_minute
+        )
+        self.model = model
+        self.token_budget = token_budget
+        self.samples_per_group = samples_per_group
+        self.max_groups = max_groups
+
+    async def summarize(self, issues: List[Issue]) -> ClusteringResult:
+        groups = group_issues(issues, self.samples_per_group)
+        sent = groups[: self.max_groups]
+
+        overhead = count_tokens(create_cluster_chunk_prompt([]), self.model)
+        chunks = chunk_by_tokens(
+            [group.describe() for group in sent],
+            overhead,
+            self.token_budget,
+            self.model,
+        )
+        summaries = await self.runner.complete_many(
+            [create_cluster_chunk_prompt(chunk) for chunk in chunks]
+        )
+
+        overhead = count_tokens(create_cluster_merge_prompt([]), self.model)
+        while len(summaries) > 1:
+            chunks = chunk_by_tokens(summaries, overhead, self.token_budget, self.model)
+            if len(chunks) == len(summaries):
+                # Summaries too large to share a chunk are merged pairwise
+                chunks = [summaries[i : i + 2] for i in range(0, len(summaries), 2)]
+            summaries = await self.runner.complete_many(
+                [create_cluster_merge_prompt(chunk) for chunk in chunks]
+            )
+
+        return ClusteringResult(
+            summary=summaries[0] if summaries else "",
+            issues=len(issues),
+            groups=len(groups),
+            groups_sent=len(sent),
+            requests=self.runner.requests_sent,
+            prompt_tokens=self.runner.prompt_tokens,
+            completion_tokens=self.runner.completion_tokens,
+        )
+
+
+def get_clustering_pipeline(client: Optional[LLMClient] = None) -> ClusteringPipeline:
+    return ClusteringPipeline(
+        client or get_llm_client(),
+        cache=get_response_cache(),
+        model=settings.OPENAI_MODEL,
+        token_budget=settings.LLM_CLUSTER_TOKEN_BUDGET,
+        samples_per_group=settings.LLM_CLUSTER_SAMPLES_PER_GROUP,
+        max_groups=settings.LLM_CLUSTER_MAX_GROUPS,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    )
@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.analysis.models import Issue
+from src.core.config import settings
+from src.llm.batching import CompletionRunner
+from src.llm.cache import ResponseCache, get_response_cache
+from src.llm.client import LLMClient, get_llm_client
+from src.llm.prompts import create_batch_explanation_prompt, parse_batch_explanations
+
+# Issues with the same message and code share one explanation
+IssueKey = Tuple[str, str]
+
+
+class ExplanationPipeline:
+    """
+    Explains issues with as few LLM requests as possible: identical issues are
+    explained once, several issues are packed into each prompt, responses are
+    cached by prompt hash, and the remaining prompts are sent concurrently
+    within the configured concurrency and rate limits.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        cache: Optional[ResponseCache] = None,
+        model: str = "",
+        batch_size: int = 10,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 0,
+    ):
+        self.runner = CompletionRunner(
+            client, cache, model, max_concurrency, requests_per_minute
+        )
+        self.batch_size = max(1, batch_size)
+
+    async def explain(self, issues: List[Issue]) -> List[str]:
+        """
+        Returns one explanation per issue, in the order of the issues.
+        """
+        unique: Dict[IssueKey, Issue] = {}
+        for issue in issues:
+            unique.setdefault((issue.message, issue.code), issue)
+        # Sorting keeps batches, and so their cache keys, stable across runs
+        keys = sorted(unique)
+        batches = [
+            keys[start : start + self.batch_size]
+            for start in range(0, len(keys), self.batch_size)
+        ]
+        prompts = [
+            create_batch_explanation_prompt([unique[key] for key in batch])
+            for batch in batches
+        ]
+        responses = await self.runner.complete_many(prompts)
+
+        explanations: Dict[IssueKey, str] = {}
+        for batch, response in zip(batches, responses):
+            parsed = parse_batch_explanations(response, len(batch))
+            explanations.update(zip(batch, parsed))
+        return [explanations[(issue.message, issue.code)] for issue in issues]
+
+
+def get_explanation_pipeline(client: Optional[LLMClient] = None) -> ExplanationPipeline:
+    return ExplanationPipeline(
+        client or get_llm_client(),
+        cache=get_response_cache(),
+        model=settings.OPENAI_MODEL,
+        batch_size=settings.LLM_BATCH_SIZE,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+    )
@@ -1,3 +1,4 @@
+import re
 from typing import List
 from src.analysis.models import Issue
 
@@ -20,3 +21,65 @@ def create_issue_clustering_prompt(issues: List[Issue]) -> str:
     Issues:
     {issue_descriptions}
     """
+
+
+def create_batch_explanation_prompt(issues: List[Issue]) -> str:
+    """
+    Builds one prompt explaining several issues. Each issue is numbered so
+    the answers can be split back apart with parse_batch_explanations.
+    """
+    issue_descriptions = "\n".join(
+        f"[{n}] Issue: {issue.message}\n    Code: {issue.code}"
+        for n, issue in enumerate(issues, start=1)
+    )
+    return f"""
+    For each of the following code issues, explain why it is problematic and suggest a refactoring idea.
+    Answer every issue in order, starting each answer on a new line with its number in square brackets, e.g. [1].
+    Issues:
+    {issue_descriptions}
+    """
+
+
+_ANSWER_MARKER = re.compile(r"^\s*\[(\d+)\]\s*", re.MULTILINE)
+
+
+def parse_batch_explanations(response: str, count: int) -> List[str]:
+    """
+    Splits the response to a batch explanation prompt into one explanation
+    per issue. Issues the response does not answer get an empty string.
+    """
+    explanations = [""] * count
+    markers = list(_ANSWER_MARKER.finditer(response))
+    for marker, following in zip(markers, markers[1:] + [None]):
+        index = int(marker.group(1)) - 1
+        end = following.start() if following else len(response)
+        if 0 <= index < count and not explanations[index]:
+            explanations[index] = response[marker.end() : end].strip()
+    return explanations
+
+
+def create_cluster_chunk_prompt(group_descriptions: List[str]) -> str:
+    """
+    Builds the map step prompt for a chunk of locally grouped issues.
+    """
+    descriptions = "\n".join(group_descriptions)
+    return f"""
+    The following groups of static analysis issues come from one repository. Each group lists its occurrence count and sample locations.
+    Cluster them into recurring themes and provide a high-level summary.
+    Groups:
+    {descriptions}
+    """
+
+
+def create_cluster_merge_prompt(summaries: List[str]) -> str:
+    """
+    Builds the reduce step prompt merging partial clustering summaries.
+    """
+    parts = "\n\n".join(
+        f"Summary {n}:\n{summary}" for n, summary in enumerate(summaries, start=1)
+    )
+    return f"""
+    The following summaries each cover part of the issues found in one repository.
+    Merge them into a single list of recurring themes and a high-level summary, combining themes that overlap.
+    {parts}
+    """
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Optional
+
+# Rough characters per token for English text and code, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+# Model whose encoding counts tokens when no model is given
+DEFAULT_MODEL = "gpt-3.5-turbo"
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Returns the tiktoken encoding of model, cached per model, or None when
+    tiktoken is not installed. tiktoken is slow to import, so it is loaded
+    when tokens are first counted.
+    """
+    try:
+        import tiktoken
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Counts the tokens of text with tiktoken when it is installed, and
+    estimates them from the text length otherwise.
+    """
+    encoding = _get_encoding(model or DEFAULT_MODEL)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return -(-len(text) // CHARS_PER_TOKEN)
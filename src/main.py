@@ -1,19 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from src.api import endpoints
+from src.analysis.engine import shutdown_executor
+from src.core.instrumentation import REGISTRY
+from src.jobs.runner import get_job_manager
 from src.data.database import engine, Base
-import os
+from src.visualization.plots import shutdown_chart_executor
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
-# Create a directory for charts
-os.makedirs("charts", exist_ok=True)
+def prepare_storage() -> None:
+    # Create database tables. No charts directory is needed: charts are
+    # rendered in memory and cached by src.visualization.plots
+    Base.metadata.create_all(bind=engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work runs here rather than at import, so importing the app (in
+    # workers, tools or tests) stays cheap and free of side effects
+    await asyncio.to_thread(prepare_storage)
+    await get_job_manager().resume()
+    yield
+    await get_job_manager().shutdown()
+    shutdown_executor()
+    shutdown_chart_executor()
 
 
 app = FastAPI(
     title="LLM-Powered Static Code Analyzer",
     description="A static code analysis tool enhanced with LLM capabilities.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(endpoints.router, prefix="/api", tags=["analysis"])
@@ -24,6 +43,11 @@ def read_root():
     return {"message": "Welcome to the LLM-Powered Static Code Analyzer API"}
 
 
-# Example of how to serve static files (e.g., charts)
-# from fastapi.staticfiles import StaticFiles
-# app.mount("/static", StaticFiles(directory="charts"), name="static")
+@app.get("/metrics", response_class=PlainTextResponse, tags=["monitoring"])
+def read_metrics():
+    """
+    Analysis stage timings and counters in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,31 +1,204 @@
-import matplotlib.pyplot as plt
+import asyncio
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
 from sqlalchemy.orm import Session
-from src.data import models as db_models
-from collections import Counter
 
+from src.core.config import settings
+from src.data import repository as repo
+
+# Bumped whenever a change to the renderers alters the charts
+CHART_STYLE_VERSION = "1"
+
+# Width of the buckets of the complexity chart
+COMPLEXITY_BUCKET_SIZE = 5
+
+# Identifies a rendered chart: (repo_id, chart type, data version)
+ChartKey = Tuple[int, str, str]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _new_figure(width: float, height: float):
+    """
+    Creates a figure bound to the Agg canvas directly. Unlike pyplot, this
+    keeps no global state, so charts can be drawn concurrently.
+    """
+    # matplotlib is slow to import, so it is loaded when a chart is first drawn
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width, height))
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _to_png(figure) -> bytes:
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def render_issue_frequency(repo_id: int, data: Sequence[Tuple[str, int]]) -> bytes:
+    labels, values = zip(*data)
+    figure = _new_figure(10, 6)
+    axes = figure.add_subplot()
+    axes.barh(labels, values)
+    axes.set_xlabel("Frequency")
+    axes.set_title(f"Issue Frequency for Repository ID {repo_id}")
+    figure.tight_layout()
+    return _to_png(figure)
+
+
+def render_complexity(repo_id: int, data: Sequence[Tuple[int, int]]) -> bytes:
+    labels = [f"{start}-{start + COMPLEXITY_BUCKET_SIZE - 1}" for start, _ in data]
+    figure = _new_figure(10, 6)
+    axes = figure.add_subplot()
+    axes.bar(labels, [count for _, count in data])
+    axes.set_xlabel("Cyclomatic complexity")
+    axes.set_ylabel("Functions")
+    axes.set_title(f"Complexity Distribution for Repository ID {repo_id}")
+    figure.tight_layout()
+    return _to_png(figure)
+
+
+def _issue_frequency_data(db: Session, repo_id: int) -> List[Tuple[str, int]]:
+    return list(repo.count_issues_by_message(db, repo_id).items())
+
+
+def _complexity_data(db: Session, repo_id: int) -> List[Tuple[int, int]]:
+    return repo.complexity_histogram(db, repo_id, COMPLEXITY_BUCKET_SIZE)
+
+
+# Chart type -> (loads the chart data with SQL aggregates, renders it to PNG)
+CHARTS: Dict[str, Tuple[Callable[[Session, int], List[Any]], Callable[..., bytes]]] = {
+    "issue_frequency": (_issue_frequency_data, render_issue_frequency),
+    "complexity": (_complexity_data, render_complexity),
+}
+
+
+def load_chart_data(db: Session, repo_id: int, chart: str) -> List[Any]:
+    """
+    Returns the aggregated data a chart is drawn from.
+    """
+    return CHARTS[chart][0](db, repo_id)
+
+
+def data_version(chart: str, data: Sequence[Any]) -> str:
+    """
+    Hashes the data of a chart together with the renderer version, so the
+    version changes exactly when the rendered chart would.
+    """
+    payload = json.dumps([CHART_STYLE_VERSION, chart, data], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ChartCache:
+    """
+    In-process cache of rendered charts keyed by (repo_id, chart type, data
+    version). The least recently used charts are evicted once the cache holds
+    more than max_entries charts.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[ChartKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: ChartKey) -> Optional[bytes]:
+        with self._lock:
+            png = self._entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key: ChartKey, png: bytes) -> None:
+        with self._lock:
+            # Older versions of the same chart can no longer be requested
+            for stale in [k for k in self._entries if k[:2] == key[:2]]:
+                del self._entries[stale]
+            self._entries[key] = png
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._entries)
+            size = sum(len(png) for png in self._entries.values())
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache: Optional[ChartCache] = None
+
+# Renders in progress, shared by concurrent requests for the same chart
+_pending: Dict[ChartKey, "asyncio.Future[bytes]"] = {}
+
+
+def get_chart_cache() -> ChartCache:
+    global _cache
+    if _cache is None:
+        _cache = ChartCache(settings.CHART_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def get_chart_executor() -> ProcessPoolExecutor:
+    """
+    Returns the process pool charts are rendered in, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.CHART_WORKERS)
+    return _executor
 
-def generate_issue_frequency_chart(db: Session, repo_id: int) -> str:
-    issues = (
-        db.query(db_models.Issue)
-        .join(db_models.File)
-        .filter(db_models.File.repository_id == repo_id)
-        .all()
-    )
-    issue_counts = Counter(issue.message for issue in issues)
 
-    if not issue_counts:
-        return ""
+def shutdown_chart_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
 
-    labels, values = zip(*issue_counts.items())
 
-    plt.figure(figsize=(10, 6))
-    plt.barh(labels, values)
-    plt.xlabel("Frequency")
-    plt.title(f"Issue Frequency for Repository ID {repo_id}")
-    plt.tight_layout()
+async def render_chart(
+    repo_id: int, chart: str, data: Sequence[Any], version: str
+) -> bytes:
+    """
+    Returns the chart as PNG, rendering it in the chart worker pool unless it
+    is cached or already being rendered for another request.
+    """
+    key = (repo_id, chart, version)
+    cache = get_chart_cache()
+    png = cache.get(key)
+    if png is not None:
+        return png
 
-    chart_path = f"charts/issue_frequency_repo_{repo_id}.png"
-    plt.savefig(chart_path)
-    plt.close()
+    pending = _pending.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
 
-    return chart_path
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_chart_executor(), CHARTS[chart][1], repo_id, data)
+    _pending[key] = future
+    try:
+        png = await asyncio.shield(future)
+    finally:
+        _pending.pop(key, None)
+    cache.put(key, png)
+    return png
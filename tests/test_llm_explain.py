@@ -0,0 +1,176 @@
+"""
+Tests of the LLM explanation pipeline, run against the stub client of the
+explanation benchmark instead of a real LLM.
+"""
+
+import asyncio
+import time
+
+from src.analysis.models import Issue
+from src.benchmarks.llm_explanations import StubLLMClient
+from src.llm.batching import CompletionRunner, RateLimiter
+from src.llm.cache import ResponseCache
+from src.llm.explain import ExplanationPipeline
+from src.llm.prompts import create_batch_explanation_prompt, parse_batch_explanations
+
+
+def _issue(message: str, code: str, line_number: int = 1) -> Issue:
+    return Issue(code=code, line_number=line_number, message=message)
+
+
+class TrackingStubClient(StubLLMClient):
+    """
+    Stub client that records the prompts it receives and the largest number
+    of requests in flight at once.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_completion_async(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await super().get_completion_async(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+def test_identical_issues_are_explained_once():
+    client = TrackingStubClient()
+    pipeline = ExplanationPipeline(client, batch_size=10)
+    issues = [
+        _issue("Long parameter list", "func_a", 1),
+        _issue("High cyclomatic complexity", "func_b", 2),
+        _issue("Long parameter list", "func_a", 30),
+        _issue("Long parameter list", "func_c", 4),
+        _issue("High cyclomatic complexity", "func_b", 50),
+    ]
+
+    explanations = asyncio.run(pipeline.explain(issues))
+
+    assert client.calls == 1
+    # Three distinct (message, code) pairs in the single batch prompt
+    assert client.prompts[0].count("Issue:") == 3
+    assert len(explanations) == len(issues)
+    assert explanations[0] == explanations[2]
+    assert explanations[1] == explanations[4]
+    assert len({explanations[0], explanations[1], explanations[3]}) == 3
+
+
+def test_issues_are_split_into_batches_and_answers_mapped_back():
+    client = TrackingStubClient()
+    pipeline = ExplanationPipeline(client, batch_size=2)
+    issues = [_issue("Long parameter list", f"func_{n}") for n in range(5)]
+
+    explanations = asyncio.run(pipeline.explain(issues))
+
+    assert client.calls == 3
+    assert [prompt.count("Issue:") for prompt in client.prompts] == [2, 2, 1]
+    # Issues are batched in sorted order; the stub numbers answers per batch
+    assert explanations == [
+        "Explanation 1.",
+        "Explanation 2.",
+        "Explanation 1.",
+        "Explanation 2.",
+        "Explanation 1.",
+    ]
+
+
+def test_batch_prompt_numbers_issues():
+    prompt = create_batch_explanation_prompt(
+        [_issue("Long parameter list", "f"), _issue("Dead code (unused function)", "g")]
+    )
+    assert "[1] Issue: Long parameter list" in prompt
+    assert "[2] Issue: Dead code (unused function)" in prompt
+
+
+def test_parse_batch_explanations():
+    response = (
+        "Some preamble.\n"
+        "[2] Second answer,\n"
+        "  continued on a second line.\n"
+        "[1] First answer.\n"
+        "[1] Repeated answer, ignored.\n"
+        "[7] Out of range, ignored.\n"
+    )
+    assert parse_batch_explanations(response, 3) == [
+        "First answer.",
+        "Second answer,\n  continued on a second line.",
+        "",
+    ]
+    assert parse_batch_explanations("No numbered answers.", 2) == ["", ""]
+
+
+def test_cached_responses_are_not_requested_again(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm_cache.db"), max_entries=100)
+    issues = [_issue("Long parameter list", f"func_{n}") for n in range(4)]
+
+    client = TrackingStubClient()
+    first = asyncio.run(
+        ExplanationPipeline(client, cache=cache, model="m", batch_size=2).explain(
+            issues
+        )
+    )
+    assert client.calls == 2
+    assert cache.stats()["entries"] == 2
+
+    client = TrackingStubClient()
+    pipeline = ExplanationPipeline(client, cache=cache, model="m", batch_size=2)
+    second = asyncio.run(pipeline.explain(issues))
+    assert client.calls == 0
+    assert pipeline.runner.requests_sent == 0
+    assert second == first
+    assert cache.stats()["hits"] == 2
+
+    # Responses are cached per model
+    client = TrackingStubClient()
+    asyncio.run(
+        ExplanationPipeline(client, cache=cache, model="other", batch_size=2).explain(
+            issues
+        )
+    )
+    assert client.calls == 2
+
+
+def test_concurrency_limit_is_respected():
+    client = TrackingStubClient(latency=0.02)
+    runner = CompletionRunner(client, max_concurrency=2)
+    prompts = [f"[1] Issue: prompt {n}" for n in range(8)]
+
+    responses = asyncio.run(runner.complete_many(prompts))
+
+    assert len(responses) == len(prompts)
+    assert client.calls == 8
+    assert runner.requests_sent == 8
+    assert client.max_in_flight == 2
+
+
+def test_rate_limiter_spaces_concurrent_requests():
+    limiter = RateLimiter(requests_per_minute=1200)  # one request every 50 ms
+    starts = []
+
+    async def request() -> None:
+        await limiter.acquire()
+        starts.append(time.monotonic())
+
+    async def main() -> None:
+        await asyncio.gather(*(request() for _ in range(5)))
+
+    asyncio.run(main())
+
+    starts.sort()
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert len(starts) == 5
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+def test_rate_limiter_disabled_without_limit():
+    limiter = RateLimiter(requests_per_minute=0)
+    started = time.monotonic()
+    asyncio.run(asyncio.wait_for(limiter.acquire(), timeout=1))
+    assert time.monotonic() - started < 0.05
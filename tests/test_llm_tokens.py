@@ -0,0 +1,47 @@
+import sys
+import types
+
+import pytest
+
+from src.llm import tokens
+
+
+class FakeEncoding:
+    def __init__(self, chars_per_token: int):
+        self.chars_per_token = chars_per_token
+
+    def encode(self, text: str):
+        return list(range(-(-len(text) // self.chars_per_token)))
+
+
+@pytest.fixture
+def fake_tiktoken(monkeypatch):
+    encodings = {"model-a": FakeEncoding(1), "model-b": FakeEncoding(2)}
+    module = types.ModuleType("tiktoken")
+
+    def encoding_for_model(model):
+        return encodings[model]
+
+    module.encoding_for_model = encoding_for_model
+    module.get_encoding = lambda name: FakeEncoding(8)
+    monkeypatch.setitem(sys.modules, "tiktoken", module)
+    tokens._get_encoding.cache_clear()
+    yield
+    tokens._get_encoding.cache_clear()
+
+
+def test_tokens_are_counted_with_the_encoding_of_each_model(fake_tiktoken):
+    assert tokens.count_tokens("abcdefgh", "model-a") == 8
+    assert tokens.count_tokens("abcdefgh", "model-b") == 4
+    assert tokens.count_tokens("abcdefgh", "model-a") == 8
+    # Models unknown to tiktoken fall back to cl100k_base
+    assert tokens.count_tokens("abcdefgh", "unknown") == 1
+
+
+def test_tokens_are_estimated_without_tiktoken(monkeypatch):
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    tokens._get_encoding.cache_clear()
+    try:
+        assert tokens.count_tokens("abcdefghi") == 3
+    finally:
+        tokens._get_encoding.cache_clear()
@@ -0,0 +1,12 @@
+"""
+Startup regression test: importing the API must not load the dependencies
+that are only imported on first use (see src.benchmarks.startup).
+"""
+
+from src.benchmarks.startup import DEFAULT_FORBIDDEN, import_times, imported_packages
+
+
+def test_app_import_loads_no_heavy_dependencies():
+    modules = import_times("src.main")
+    assert "src.main" in modules
+    assert imported_packages(modules, DEFAULT_FORBIDDEN) == []